@@ -0,0 +1,176 @@
+import itertools
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from Instrumentation import PipelineTimer
+from Two_Lens_System import (BOUND_COLUMNS, DESIGN_COLUMNS, WAVELENGTH_DEFAULT, bounds_mask, input_range,
+                             two_lens_properties)
+
+# --- Constants ---
+COARSE_CELLS_DEFAULT = 8  # Cells per axis on the coarse grid
+MAX_LEVELS_DEFAULT = 4  # Each level halves the cell size
+MAX_ACTIVE_CELLS = 5_000_000  # Refinement stops before the next level would exceed this
+CELL_CHUNK_SIZE = 50_000  # Cells evaluated per step (x16 corners)
+CORNER_OFFSETS = np.array(list(itertools.product((0, 1), repeat=len(DESIGN_COLUMNS))))
+OUTPUT_COLUMNS = ["f1", "f2", "d", "S", "D1", "D2", "I1", "I2", "M_total", "Resolution", "Linear_FOV", "Level"]
+
+
+# --- Functions ---
+
+def _corner_sides(values, bounds):
+    """Per constraint, where each corner value falls: -1 below, 0 inside, 1 above, 2 undefined."""
+    sides = []
+    for column, (min_val, max_val) in bounds.items():
+        if min_val is None or max_val is None:
+            continue
+        magnitude = np.abs(values[column])
+        side = np.where(magnitude < min_val, -1, np.where(magnitude > max_val, 1, 0))
+        sides.append(np.where(np.isfinite(magnitude), side, 2))
+    return sides
+
+
+def _cells_to_refine(values, inside, bounds):
+    """Cells with a feasible corner, corners on both sides of a bound, or a pole (S = f1, S2 = f2) inside."""
+    refine = inside.any(axis=1)
+    for side in _corner_sides(values, bounds):
+        refine |= side.min(axis=1) != side.max(axis=1)
+    for denominator in (values["S"] - values["f1"], values["S2"] - values["f2"]):
+        signs = np.sign(denominator)
+        refine |= signs.min(axis=1) != signs.max(axis=1)
+    return refine
+
+
+def adaptive_sweep(ranges, bounds, coarse_cells=COARSE_CELLS_DEFAULT, max_levels=MAX_LEVELS_DEFAULT,
+                   aperture_diameter=1.0, field_diameter=1.0, wavelength=WAVELENGTH_DEFAULT):
+    """
+    Sweeps the (f1, f2, d, S) design space, refining only near feasible designs.
+
+    The sweep starts from a coarse grid of cells. At each level every active
+    cell's 16 corners are evaluated. A cell is split into 16 children when a
+    corner is inside the Refiner bounds, when its corners fall on different
+    sides of a bound, or when the cell spans a pole of the lens equations.
+    All other cells are dropped. Corner-based tests can miss a feasible
+    pocket smaller than a coarse cell that touches no corner, so the coarse
+    grid should still resolve the features of interest.
+
+    Args:
+        ranges (dict): Maps each axis in DESIGN_COLUMNS to its (min, max) range (cm).
+        bounds (dict): Maps a column in BOUND_COLUMNS to a (min, max) tuple.
+        coarse_cells (int): Cells per axis on the coarse grid.
+        max_levels (int): Number of refinements; the finest grid step is the
+            coarse step / 2**max_levels.
+        aperture_diameter (float): Diameter of the first lens (cm).
+        field_diameter (float): Diameter of the second lens (cm).
+        wavelength (float): Wavelength of light (cm).
+
+    Returns:
+        DataFrame: Every distinct grid point found inside the bounds, with
+                   OUTPUT_COLUMNS. Level is the coarsest level it was found at.
+    """
+    lows = np.array([ranges[axis][0] for axis in DESIGN_COLUMNS], dtype=float)
+    highs = np.array([ranges[axis][1] for axis in DESIGN_COLUMNS], dtype=float)
+    cells = np.array(list(itertools.product(range(coarse_cells), repeat=len(DESIGN_COLUMNS))), dtype=np.int64)
+    # Feasible points are kept as flat indices into the finest grid, so duplicates are cheap to drop
+    grid_shape = (coarse_cells * 2 ** max_levels + 1,) * len(DESIGN_COLUMNS)
+    found_keys, found_levels = [], []
+
+    for level in range(max_levels + 1):
+        step = (highs - lows) / (coarse_cells * 2 ** level)
+        refining = level < max_levels
+        children, level_keys = [], []
+        child_count = 0
+        for start in range(0, len(cells), CELL_CHUNK_SIZE):
+            block = cells[start:start + CELL_CHUNK_SIZE]
+            corners = block[:, None, :] + CORNER_OFFSETS[None, :, :]
+            coords = lows + corners * step
+            values = two_lens_properties(*(coords[..., axis] for axis in range(len(DESIGN_COLUMNS))),
+                                         aperture_diameter, field_diameter, wavelength)
+            values.update({axis: coords[..., index] for index, axis in enumerate(DESIGN_COLUMNS)})
+            inside = np.broadcast_to(bounds_mask(values, bounds), corners.shape[:2])
+
+            # Sibling cells share most corners, so de-duplicate each chunk right away
+            points = corners[inside] * 2 ** (max_levels - level)
+            level_keys.append(np.unique(np.ravel_multi_index(tuple(points.T), grid_shape)))
+
+            if refining:
+                refine = _cells_to_refine(values, inside, bounds)
+                child_count += int(refine.sum()) * len(CORNER_OFFSETS)
+                if child_count > MAX_ACTIVE_CELLS:
+                    # Checked before the children are built; this level's points are still collected
+                    print(f"Stopping refinement at level {level}: level {level + 1} would need more than "
+                          f"{MAX_ACTIVE_CELLS} active cells.")
+                    refining, children = False, []
+                else:
+                    children.append((2 * block[refine])[:, None, :] + CORNER_OFFSETS[None])
+
+        keys = np.unique(np.concatenate(level_keys)) if level_keys else np.empty(0, np.int64)
+        found_keys.append(keys)
+        found_levels.append(np.full(len(keys), level))
+        if not refining or not children:
+            break
+        cells = np.concatenate(children).reshape(-1, len(DESIGN_COLUMNS))
+
+    # Levels were visited coarsest first, so the first occurrence of a point is its coarsest level
+    keys, first = np.unique(np.concatenate(found_keys), return_index=True)
+    levels = np.concatenate(found_levels)[first]
+    points = np.stack(np.unravel_index(keys, grid_shape), axis=1)
+
+    finest_step = (highs - lows) / (coarse_cells * 2 ** max_levels)
+    coords = lows + points * finest_step
+    f1, f2, d, S = (coords[:, axis] for axis in range(len(DESIGN_COLUMNS)))
+    values = two_lens_properties(f1, f2, d, S, aperture_diameter, field_diameter, wavelength)
+    return pd.DataFrame({
+        "f1": f1,
+        "f2": f2,
+        "d": d,
+        "S": S,
+        "D1": aperture_diameter,
+        "D2": field_diameter,
+        "I1": values["I1"],
+        "I2": values["I2"],
+        "M_total": values["M_total"],
+        "Resolution": values["Resolution"],
+        "Linear_FOV": values["Linear_FOV"],
+        "Level": levels,
+    }, columns=OUTPUT_COLUMNS)
+
+
+def main():
+    try:
+        ranges = {axis: input_range(f"{axis} (cm)", optional=False) for axis in DESIGN_COLUMNS}
+        aperture_diameter = float(input("Diameter of lens 1 (cm): "))
+        field_diameter = float(input("Diameter of lens 2 (cm): "))
+        coarse_cells = int(input(f"Coarse cells per axis (blank for {COARSE_CELLS_DEFAULT}): ").strip()
+                           or COARSE_CELLS_DEFAULT)
+        max_levels = int(input(f"Refinement levels (blank for {MAX_LEVELS_DEFAULT}): ").strip() or MAX_LEVELS_DEFAULT)
+        bounds = {column: input_range(column) for column in BOUND_COLUMNS}
+    except ValueError:
+        print("Invalid input. Please enter numeric values only.")
+        return
+
+    timer = PipelineTimer("adaptive_generator")
+    with timer.stage("generate") as record:
+        results_df = adaptive_sweep(ranges, bounds, coarse_cells, max_levels, aperture_diameter, field_diameter)
+        record["rows"] = len(results_df)
+    uniform_rows = (coarse_cells * 2 ** max_levels + 1) ** len(DESIGN_COLUMNS)
+    print(f"{len(results_df)} feasible designs; a uniform sweep at the same resolution would have {uniform_rows} rows.")
+
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    output_db = f"adaptive_results_{timestamp}.db"
+    try:
+        with timer.stage("save_sqlite", rows=len(results_df)):
+            conn = sqlite3.connect(output_db)
+            results_df.to_sql('results', conn, if_exists='replace', index=False)
+            conn.commit()
+            conn.close()
+        print(f"Results saved to '{output_db}'.")
+    except Exception as e:
+        print(f"An error occurred while saving the results as database: {e}")
+    print(timer.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+from matplotlib.colors import LogNorm
+from matplotlib.figure import Figure
+from matplotlib.widgets import RectangleSelector
+
+# --- Constants ---
+OVERVIEW_PAIRS = (("M_total", "I2"), ("Resolution", "Linear_FOV"))
+OVERVIEW_BINS = 200
+ZOOM_CACHE_SIZE = 32  # Zoomed histograms kept per dataset
+REBIN_DELAY_MS = 300  # Wait for the zoom to settle before re-binning
+BIN_POLL_MS = 100  # How often the window checks on a background binning job
+
+
+# --- Classes ---
+
+class DensityOverview:
+    """
+    2D histograms of the result space, built incrementally over data chunks.
+
+    Values are binned by magnitude, as the Refiner bounds compare abs(value).
+    The full-range histograms of every pair are computed in one pass over the
+    data and kept; zoomed histograms read and re-bin only the points inside
+    the zoomed region and are cached as well.
+
+    Args:
+        chunk_source (callable): chunk_source(ranges=None) returns a fresh
+            iterable of DataFrame chunks. ranges maps a column to a
+            (low, high) pair of magnitudes; the source may skip rows outside
+            them (points outside are dropped while binning regardless).
+        pairs (tuple): (x column, y column) pairs to bin.
+        bins (int): Bins per axis.
+    """
+
+    def __init__(self, chunk_source, pairs=OVERVIEW_PAIRS, bins=OVERVIEW_BINS):
+        self.chunk_source = chunk_source
+        self.pairs = pairs
+        self.bins = bins
+        self._extents = None
+        self._cache = {}
+
+    def _columns(self):
+        return sorted({column for pair in self.pairs for column in pair})
+
+    def _chunk_values(self, chunk, column):
+        return np.abs(chunk[column].to_numpy(dtype=float))
+
+    def extents(self):
+        """Returns the (min, max) magnitude of every binned column, over finite values."""
+        if self._extents is None:
+            lows = {column: np.inf for column in self._columns()}
+            highs = {column: -np.inf for column in self._columns()}
+            for chunk in self.chunk_source():
+                for column in lows:
+                    values = self._chunk_values(chunk, column)
+                    values = values[np.isfinite(values)]
+                    if values.size:
+                        lows[column] = min(lows[column], values.min())
+                        highs[column] = max(highs[column], values.max())
+            self._extents = {}
+            for column in lows:
+                low, high = lows[column], highs[column]
+                if not np.isfinite(low):
+                    low, high = 0.0, 1.0
+                elif low == high:
+                    low, high = low - 0.5, high + 0.5
+                self._extents[column] = (float(low), float(high))
+        return self._extents
+
+    def full_extent(self, x, y):
+        extents = self.extents()
+        return extents[x] + extents[y]
+
+    def _bin_chunk(self, x_values, y_values, extent):
+        """Counts one chunk into a bins x bins grid; points outside extent are dropped."""
+        x0, x1, y0, y1 = extent
+        with np.errstate(invalid='ignore'):
+            inside = (x_values >= x0) & (x_values <= x1) & (y_values >= y0) & (y_values <= y1)
+        x_values, y_values = x_values[inside], y_values[inside]
+        # Uniform bins: direct index arithmetic is much faster than np.histogram2d
+        ix = np.minimum(((x_values - x0) * (self.bins / (x1 - x0))).astype(np.int64), self.bins - 1)
+        iy = np.minimum(((y_values - y0) * (self.bins / (y1 - y0))).astype(np.int64), self.bins - 1)
+        return np.bincount(ix * self.bins + iy, minlength=self.bins * self.bins).reshape(self.bins, self.bins)
+
+    def histogram(self, x, y, extent=None):
+        """
+        Returns the histogram of one pair.
+
+        Args:
+            x (str): Column on the x axis.
+            y (str): Column on the y axis.
+            extent (tuple): (x0, x1, y0, y1) region to bin, or None for the
+                full data range.
+
+        Returns:
+            tuple: (counts, extent). counts[i, j] is the number of designs in
+                   x bin i and y bin j.
+        """
+        if extent is None:
+            extent = self.full_extent(x, y)
+            if (x, y, extent) not in self._cache:
+                self._bin_full_range()
+            return self._cache[(x, y, extent)], extent
+
+        extent = tuple(float(value) for value in extent)
+        key = (x, y, extent)
+        if key not in self._cache:
+            counts = np.zeros((self.bins, self.bins), dtype=np.int64)
+            ranges = {x: extent[:2], y: extent[2:]}
+            for chunk in self.chunk_source(ranges):
+                counts += self._bin_chunk(self._chunk_values(chunk, x), self._chunk_values(chunk, y), extent)
+            if len(self._cache) >= ZOOM_CACHE_SIZE + len(self.pairs):
+                # Drop the oldest zoomed histogram; the full-range ones were stored first
+                zoomed = [cached for cached in self._cache if cached[2] != self.full_extent(*cached[:2])]
+                if zoomed:
+                    del self._cache[zoomed[0]]
+            self._cache[key] = counts
+        return self._cache[key], extent
+
+    def _bin_full_range(self):
+        """Bins every pair over its full range in a single pass over the data."""
+        extents = {pair: self.full_extent(*pair) for pair in self.pairs}
+        counts = {pair: np.zeros((self.bins, self.bins), dtype=np.int64) for pair in self.pairs}
+        for chunk in self.chunk_source():
+            values = {column: self._chunk_values(chunk, column) for column in self._columns()}
+            for pair in self.pairs:
+                counts[pair] += self._bin_chunk(values[pair[0]], values[pair[1]], extents[pair])
+        for pair in self.pairs:
+            self._cache[pair + (extents[pair],)] = counts[pair]
+
+
+class DensityOverviewWindow:
+    """
+    Toplevel window showing a DensityOverview.
+
+    Zooming with the toolbar re-bins the visible region on a worker thread,
+    so the window stays responsive while large datasets are read. Dragging
+    with the right mouse button picks a rectangle and hands its ranges to
+    on_bounds_picked as {x column: (min, max), y column: (min, max)}.
+    """
+
+    def __init__(self, master, overview, on_bounds_picked=None, title="Result Space Overview"):
+        self.overview = overview
+        self.on_bounds_picked = on_bounds_picked
+        self.top = tk.Toplevel(master)
+        self.top.title(title)
+        self.pair_name = tk.StringVar(value=self._pair_label(overview.pairs[0]))
+        self._drawn = None  # (x, y, extent) currently on screen
+        self._rebin_job = None
+        self._worker = None
+        self._pending = None  # (extent,) requested while a worker was busy
+
+        controls = ttk.Frame(self.top, padding="5")
+        controls.pack(side=tk.TOP, fill=tk.X)
+        ttk.Label(controls, text="Axes:").pack(side=tk.LEFT)
+        pair_box = ttk.Combobox(controls, textvariable=self.pair_name, state="readonly",
+                                values=[self._pair_label(pair) for pair in overview.pairs])
+        pair_box.pack(side=tk.LEFT, padx=5)
+        pair_box.bind("<<ComboboxSelected>>", self._on_pair_selected)
+        self.status_label = ttk.Label(controls, text="Zoom with the toolbar; drag with the right mouse button to pick bounds.")
+        self.status_label.pack(side=tk.LEFT, padx=5)
+
+        self.figure = Figure(figsize=(7, 5))
+        self.ax = self.figure.add_subplot(111)
+        self.ax.set_title("Design density (|value|)")
+        self.image = self.ax.imshow(np.ma.masked_all((1, 1)), origin="lower", aspect="auto",
+                                    interpolation="nearest", cmap="viridis", norm=LogNorm(vmin=1, vmax=10))
+        self.colorbar = self.figure.colorbar(self.image, ax=self.ax, label="Designs per bin")
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self.top)
+        self.toolbar = NavigationToolbar2Tk(self.canvas, self.top)
+        self.toolbar.update()
+        self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+
+        self.selector = RectangleSelector(self.ax, self._on_select, button=[3], useblit=True, interactive=False)
+        self.ax.callbacks.connect("xlim_changed", self._schedule_rebin)
+        self.ax.callbacks.connect("ylim_changed", self._schedule_rebin)
+        self._draw(extent=None)
+
+    def _pair_label(self, pair):
+        return f"{pair[0]} vs {pair[1]}"
+
+    def _current_pair(self):
+        return next(pair for pair in self.overview.pairs if self._pair_label(pair) == self.pair_name.get())
+
+    def _on_pair_selected(self, event):
+        self.toolbar.update()  # Forget the zoom history of the previous pair
+        self._draw(extent=None)
+
+    def _draw(self, extent):
+        x, y = self._current_pair()
+        if self._worker is not None and self._worker.is_alive():
+            self._pending = (extent,)  # Only the latest request is binned next
+            return
+        self.status_label.config(text="Binning...")
+        self.top.config(cursor="watch")
+        outcome = queue.Queue(maxsize=1)
+
+        def work():
+            try:
+                outcome.put((self.overview.histogram(x, y, extent), None))
+            except Exception as e:
+                outcome.put((None, e))
+
+        self._worker = threading.Thread(target=work, name="density-overview", daemon=True)
+        self._worker.start()
+        self.top.after(BIN_POLL_MS, self._poll_binning, x, y, extent is not None, outcome)
+
+    def _poll_binning(self, x, y, zoomed, outcome):
+        if not self.top.winfo_exists():
+            return
+        if self._worker.is_alive():
+            self.top.after(BIN_POLL_MS, self._poll_binning, x, y, zoomed, outcome)
+            return
+        self.top.config(cursor="")
+        if self._pending is not None:
+            # The view moved on while binning; skip this result and bin the latest request
+            extent, = self._pending
+            self._pending = None
+            self._draw(extent)
+            return
+        result, error = outcome.get_nowait()
+        if error is not None:
+            self.status_label.config(text=f"Binning failed: {error}")
+            return
+        self._show(x, y, *result, zoomed)
+
+    def _show(self, x, y, counts, extent, zoomed):
+        self._drawn = (x, y, extent)
+
+        # Empty bins are left blank so the log colour scale stays defined
+        self.image.set_data(np.ma.masked_equal(counts.T, 0))
+        self.image.set_extent(extent)
+        self.image.set_norm(LogNorm(vmin=1, vmax=max(1, counts.max())))
+        self.colorbar.update_normal(self.image)
+        self.ax.set_xlabel(x)
+        self.ax.set_ylabel(y)
+        if not zoomed:
+            # The axis callbacks see the drawn extent and skip re-binning
+            self.ax.set_xlim(extent[0], extent[1])
+            self.ax.set_ylim(extent[2], extent[3])
+        self.canvas.draw_idle()
+        self.status_label.config(text=f"{int(counts.sum())} designs in view. Right-drag to pick bounds.")
+
+    def _schedule_rebin(self, ax):
+        if self._rebin_job is not None:
+            self.top.after_cancel(self._rebin_job)
+        self._rebin_job = self.top.after(REBIN_DELAY_MS, self._rebin)
+
+    def _rebin(self):
+        self._rebin_job = None
+        if self._drawn is None:
+            return
+        x, y, drawn_extent = self._drawn
+        extent = tuple(self.ax.get_xlim()) + tuple(self.ax.get_ylim())
+        if np.allclose(extent, drawn_extent):
+            return
+        if np.allclose(extent, self.overview.full_extent(x, y)):
+            extent = None  # Back home: reuse the full-range histogram
+        self._draw(extent)
+
+    def _on_select(self, press, release):
+        if self.on_bounds_picked is None or None in (press.xdata, release.xdata, press.ydata, release.ydata):
+            return
+        x, y = self._current_pair()
+        bounds = {
+            x: (min(press.xdata, release.xdata), max(press.xdata, release.xdata)),
+            y: (min(press.ydata, release.ydata), max(press.ydata, release.ydata)),
+        }
+        self.on_bounds_picked(bounds)
+        self.status_label.config(text=f"Picked {x} {bounds[x][0]:.6g}-{bounds[x][1]:.6g}, "
+                                      f"{y} {bounds[y][0]:.6g}-{bounds[y][1]:.6g}")
@@ -0,0 +1,117 @@
+import threading
+from contextlib import nullcontext
+
+import pandas as pd
+from openpyxl import Workbook
+
+# --- Constants ---
+EXCEL_MAX_ROWS = 1_048_576  # Excel's hard limit per sheet, header row included
+EXPORT_CHUNK_SIZE = 50_000
+
+
+# --- Functions ---
+
+def frame_chunks(df, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yields consecutive row slices of a DataFrame; an empty frame is yielded once, for its columns."""
+    for start in range(0, max(len(df), 1), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+
+def sqlite_chunks(conn, table_name, chunk_size=EXPORT_CHUNK_SIZE, columns=None, ranges=None):
+    """
+    Yields a SQLite table (or some of its columns) as DataFrame chunks, without loading it whole.
+
+    ranges maps a column to a (low, high) pair; only rows with
+    low <= |value| <= high in every such column are read.
+    """
+    selected = ", ".join(f'"{column}"' for column in columns) if columns else "*"
+    query = f"SELECT {selected} FROM {table_name}"
+    params = []
+    if ranges:
+        query += " WHERE " + " AND ".join(f'ABS("{column}") BETWEEN ? AND ?' for column in ranges)
+        params = [float(value) for low_high in ranges.values() for value in low_high]
+    yield from pd.read_sql(query, conn, params=params, chunksize=chunk_size)
+
+
+def write_excel_streaming(chunks, output_file, sheet_name="results", max_rows=EXCEL_MAX_ROWS):
+    """
+    Writes DataFrame chunks to an Excel file in constant memory.
+
+    Rows go through an openpyxl write-only workbook, so only the current
+    chunk is held in memory. When a sheet reaches Excel's row limit a new
+    sheet (results, results_2, ...) is started with the same header.
+
+    Args:
+        chunks (iterable): DataFrames with the same columns.
+        output_file (str): Path of the .xlsx file to write.
+        sheet_name (str): Name of the first sheet; later sheets get a suffix.
+        max_rows (int): Rows per sheet, header included.
+
+    Returns:
+        tuple: (rows written, number of sheets).
+    """
+    workbook = Workbook(write_only=True)
+    sheet = None
+    header = None
+    sheet_rows = 0
+    sheet_count = 0
+    total_rows = 0
+
+    for chunk in chunks:
+        if header is None:
+            header = [str(column) for column in chunk.columns]
+        # Excel has no NaN; leave those cells empty like DataFrame.to_excel does
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        for row in chunk.itertuples(index=False, name=None):
+            if sheet is None or sheet_rows >= max_rows:
+                sheet_count += 1
+                title = sheet_name if sheet_count == 1 else f"{sheet_name}_{sheet_count}"
+                sheet = workbook.create_sheet(title=title[:31])
+                sheet.append(header)
+                sheet_rows = 1
+            sheet.append(row)
+            sheet_rows += 1
+            total_rows += 1
+
+    if sheet is None:
+        # No rows; still write the header like DataFrame.to_excel does
+        sheet = workbook.create_sheet(title=sheet_name[:31])
+        if header is not None:
+            sheet.append(header)
+        sheet_count = 1
+    workbook.save(output_file)
+    return total_rows, sheet_count
+
+
+def start_excel_export(chunks, output_file, on_done=None, sheet_name="results", timer=None):
+    """
+    Runs write_excel_streaming on a background thread.
+
+    Args:
+        chunks (iterable): DataFrames with the same columns.
+        output_file (str): Path of the .xlsx file to write.
+        on_done (callable): Called from the worker thread as
+            on_done(result, error) when the export ends. result is the
+            (rows, sheets) tuple, or None if the export raised error.
+        sheet_name (str): Name of the first sheet.
+        timer (PipelineTimer): If given, the export is recorded as its
+            "save_excel" stage.
+
+    Returns:
+        threading.Thread: The started worker; join() it to wait for the file.
+    """
+    def worker():
+        try:
+            with timer.stage("save_excel") if timer else nullcontext({}) as record:
+                result = write_excel_streaming(chunks, output_file, sheet_name=sheet_name)
+                record["rows"] = result[0]
+        except Exception as e:
+            if on_done:
+                on_done(None, e)
+            return
+        if on_done:
+            on_done(result, None)
+
+    thread = threading.Thread(target=worker, name=f"excel-export-{output_file}")
+    thread.start()
+    return thread
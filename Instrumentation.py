@@ -0,0 +1,118 @@
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+# --- Constants ---
+TIMING_LOG_DEFAULT = "pipeline_timings.jsonl"
+
+
+# --- Classes ---
+
+class PipelineTimer:
+    """
+    Records wall time, throughput and peak memory for each stage of a pipeline.
+
+    Usage:
+        timer = PipelineTimer("refine", log_file="pipeline_timings.jsonl")
+        with timer.stage("load") as record:
+            df = pd.read_sql(...)
+            record["rows"] = len(df)
+        print(timer.summary())
+        timer.write_log()
+
+    Peak memory comes from tracemalloc and covers allocations made by Python
+    and NumPy/pandas during the stage. Tracing slows allocation-heavy stages
+    down several times, so it is off unless a log file is given or
+    track_memory is set. tracemalloc is process-wide, so stages run on other
+    threads (such as a background Excel export) never start or stop it and
+    report no peak.
+    """
+
+    def __init__(self, pipeline, log_file=None, track_memory=None):
+        self.pipeline = pipeline
+        self.log_file = log_file
+        self.track_memory = log_file is not None if track_memory is None else track_memory
+        self.run_id = datetime.now().strftime("%Y-%m-%d_%H-%M-%S-%f")
+        self.records = []
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """Times one stage. Set record["rows"] inside the block if the row count is known only afterwards."""
+        record = {"pipeline": self.pipeline, "run_id": self.run_id, "stage": name, "rows": rows}
+        started_tracing = False
+        track_memory = self.track_memory and threading.current_thread() is threading.main_thread()
+        if track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            if track_memory:
+                record["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+                if started_tracing:
+                    tracemalloc.stop()
+            else:
+                record["peak_mb"] = None
+            if record["rows"] is not None and record["seconds"] > 0:
+                record["rows_per_sec"] = record["rows"] / record["seconds"]
+            else:
+                record["rows_per_sec"] = None
+            self.records.append(record)
+
+    def summary(self):
+        """Returns one line per recorded stage, for a status label or the console."""
+        lines = []
+        for record in self.records:
+            line = f"{record['stage']}: {record['seconds']:.2f} s"
+            if record["rows_per_sec"] is not None:
+                line += f", {record['rows']} rows ({record['rows_per_sec']:,.0f} rows/s)"
+            if record["peak_mb"] is not None:
+                line += f", peak {record['peak_mb']:.1f} MB"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def write_log(self):
+        """Appends the recorded stages to the JSON-lines log, if one was given."""
+        if not self.log_file:
+            return
+        with open(self.log_file, "a", encoding="utf-8") as log:
+            for record in self.records:
+                log.write(json.dumps(record) + "\n")
+
+
+# --- Functions ---
+
+def summarize_log(log_file=TIMING_LOG_DEFAULT):
+    """
+    Aggregates a JSON-lines timing log across runs.
+
+    Args:
+        log_file (str): Path of the log written by PipelineTimer.write_log.
+
+    Returns:
+        DataFrame: One row per (pipeline, stage) with run count and mean/max
+                   of seconds, rows/sec and peak memory.
+    """
+    import pandas as pd
+
+    df = pd.read_json(log_file, lines=True)
+    return df.groupby(["pipeline", "stage"]).agg(
+        runs=("run_id", "nunique"),
+        mean_seconds=("seconds", "mean"),
+        max_seconds=("seconds", "max"),
+        mean_rows_per_sec=("rows_per_sec", "mean"),
+        max_peak_mb=("peak_mb", "max"),
+    ).reset_index()
+
+
+if __name__ == "__main__":
+    import sys
+
+    print(summarize_log(sys.argv[1] if len(sys.argv) > 1 else TIMING_LOG_DEFAULT).to_string(index=False))
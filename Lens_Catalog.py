@@ -0,0 +1,359 @@
+import re
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from Instrumentation import PipelineTimer
+from Two_Lens_System import BOUND_COLUMNS, WAVELENGTH_DEFAULT, bounds_mask, input_range, two_lens_properties
+
+# --- Constants ---
+CATALOG_COLUMN_ALIASES = {
+    "focal_length": ("focal_length", "focal_length_cm", "f", "efl"),
+    "diameter": ("diameter", "diameter_cm", "d", "dia"),
+    "part_number": ("part_number", "part", "part_no", "pn", "sku"),
+}
+SEARCH_CHUNK_SIZE = 1_000_000  # (lens 1, S, d) combinations bounded per step
+CANDIDATE_CHUNK_SIZE = 2_000_000  # Candidate pairs evaluated per step
+OUTPUT_COLUMNS = ["Part_1", "Part_2", "f1", "f2", "D1", "D2", "d", "S",
+                  "I1", "I2", "M_total", "Resolution", "Linear_FOV"]
+
+
+# --- Functions ---
+
+def _normalize_column(name):
+    return re.sub(r"[^a-z0-9]+", "_", str(name).strip().lower()).strip("_")
+
+
+def load_catalog(file_name):
+    """
+    Loads a local CSV lens catalog.
+
+    The CSV needs a focal length, a diameter and a part number column. Header
+    spelling is forgiving ("Focal Length", "focal_length", "EFL", ...).
+    Lengths are in cm, like the rest of the generator.
+
+    Args:
+        file_name (str): Path of the CSV file.
+
+    Returns:
+        DataFrame: Columns focal_length, diameter and part_number, sorted by
+                   focal length. Rows with missing or non-positive diameters
+                   are dropped.
+    """
+    df = pd.read_csv(file_name)
+    normalized = {_normalize_column(column): column for column in df.columns}
+    renames = {}
+    for target, aliases in CATALOG_COLUMN_ALIASES.items():
+        source = next((normalized[alias] for alias in aliases if alias in normalized), None)
+        if source is None:
+            raise ValueError(f"Catalog {file_name} has no '{target}' column.")
+        renames[source] = target
+
+    catalog = df[list(renames)].rename(columns=renames)
+    catalog["focal_length"] = pd.to_numeric(catalog["focal_length"], errors="coerce")
+    catalog["diameter"] = pd.to_numeric(catalog["diameter"], errors="coerce")
+    catalog["part_number"] = catalog["part_number"].astype(str)
+    catalog = catalog.dropna(subset=["focal_length", "diameter"])
+    catalog = catalog[(catalog["focal_length"] != 0) & (catalog["diameter"] > 0)]
+    return catalog.sort_values("focal_length", kind="stable").reset_index(drop=True)
+
+
+def _active_bound(bounds, column):
+    """Returns the (min, max) bound of a column, or (0, inf) when it is not fully specified."""
+    min_val, max_val = bounds.get(column, (None, None))
+    if min_val is None or max_val is None:
+        return 0.0, np.inf
+    return float(min_val), float(max_val)
+
+
+def _expand_ranges(lo, hi, max_pairs=CANDIDATE_CHUNK_SIZE):
+    """
+    Expands per-row [lo, hi) index ranges into (row, index) pairs.
+
+    Yields the pairs in batches of about max_pairs, split on the running
+    total of range lengths, so wide ranges never build rows x N arrays at
+    once. A single row wider than max_pairs still comes as one batch.
+    """
+    counts = np.maximum(hi - lo, 0)
+    ends = np.cumsum(counts)
+    start = 0
+    while start < len(counts):
+        done = ends[start - 1] if start else 0
+        stop = max(start + 1, int(np.searchsorted(ends, done + max_pairs, side='right')))
+        batch = counts[start:stop]
+        if batch.sum():
+            rows = np.repeat(np.arange(start, stop), batch)
+            offsets = np.arange(batch.sum()) - np.repeat(np.cumsum(batch) - batch, batch)
+            yield rows, lo[rows] + offsets
+        start = stop
+
+
+def _lens2_power_ranges(powers, S2, m1, bounds):
+    """
+    Bounds the power (1 / f2) of the second lens that can satisfy the I2 and M_total bounds.
+
+    Since M_total = m1 * I2 / S2, both bounds restrict |I2| to an interval
+    [a, b], and 1/f2 = 1/I2 + 1/S2 maps it to one power interval for a real
+    final image and one for a virtual one.
+
+    Returns:
+        tuple: (lo1, hi1, lo2, hi2) index ranges into the sorted powers array.
+    """
+    a, b = _active_bound(bounds, "I2")
+    a, b = np.full(S2.shape, a), np.full(S2.shape, b)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if None not in bounds.get("M_total", (None, None)):
+            m_min, m_max = _active_bound(bounds, "M_total")
+            scale = np.abs(S2 / m1)
+            a = np.maximum(a, m_min * scale)
+            b = np.minimum(b, m_max * scale)
+        inv_a, inv_b, inv_S2 = 1 / a, 1 / b, 1 / S2
+        # Widen by a few ulps; the exact filter runs on every candidate afterwards
+        slack = 1e-9 * (np.abs(inv_S2) + np.abs(inv_b)) + 1e-15
+        lo1 = np.searchsorted(powers, inv_S2 + inv_b - slack, side='left')
+        hi1 = np.searchsorted(powers, inv_S2 + inv_a + slack, side='right')
+        lo2 = np.searchsorted(powers, inv_S2 - inv_a - slack, side='left')
+        hi2 = np.minimum(np.searchsorted(powers, inv_S2 - inv_b + slack, side='right'), lo1)
+    empty = ~(a <= b) | ~np.isfinite(inv_S2)
+    hi1[empty] = lo1[empty]
+    hi2[empty] = lo2[empty]
+    return lo1, hi1, lo2, hi2
+
+
+def _lens2_diameter_ranges(diameters, S, d, bounds):
+    """
+    Bounds the diameter of the second lens that can satisfy the Linear_FOV bound.
+
+    Linear_FOV = S * D2 / d, so |Linear_FOV| in [min, max] means D2 in
+    [min, max] * |d / S|. Rows where that ratio is undefined keep the whole
+    catalog and are left to the exact filter.
+
+    Returns:
+        tuple: (lo, hi) index ranges into the sorted diameters array.
+    """
+    fov_min, fov_max = _active_bound(bounds, "Linear_FOV")
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.abs(d / S)
+        lo = np.searchsorted(diameters, fov_min * ratio * (1 - 1e-9), side='left')
+        hi = np.searchsorted(diameters, fov_max * ratio * (1 + 1e-9), side='right')
+    undefined = ~np.isfinite(ratio) | np.isinf(fov_max)
+    lo[undefined] = 0
+    hi[undefined] = len(diameters)
+    return lo, hi
+
+
+def search_pairs(catalog, separations, object_distances, bounds, wavelength=WAVELENGTH_DEFAULT):
+    """
+    Finds every catalog lens pair, separation and object distance inside the Refiner bounds.
+
+    Instead of evaluating all N^2 catalog pairs, each (lens 1, object distance,
+    separation) combination is bounded first: Resolution prunes it outright,
+    and the I2 and M_total bounds are solved for the range of
+    lens 2 powers that can pass. The Linear_FOV bound likewise gives a range
+    of lens 2 diameters. Each range is binary searched in the catalog sorted
+    by power or by diameter, the narrower one is kept per combination, and
+    only those candidate pairs are evaluated, a bounded batch at a time.
+
+    Args:
+        catalog (DataFrame): Output of load_catalog.
+        separations (array-like): Lens separations to try (cm).
+        object_distances (array-like): Object distances to try (cm).
+        bounds (dict): Maps a column in BOUND_COLUMNS to a (min, max) tuple.
+        wavelength (float): Wavelength of light (cm).
+
+    Returns:
+        DataFrame: One row per feasible design, with OUTPUT_COLUMNS.
+    """
+    focal_lengths = catalog["focal_length"].to_numpy(dtype=float)
+    diameters = catalog["diameter"].to_numpy(dtype=float)
+    parts = catalog["part_number"].to_numpy()
+    order = np.argsort(1 / focal_lengths, kind="stable")
+    powers = 1 / focal_lengths[order]
+    diameter_order = np.argsort(diameters, kind="stable")
+    sorted_diameters = diameters[diameter_order]
+    separations = np.asarray(separations, dtype=float)
+    object_distances = np.asarray(object_distances, dtype=float)
+    res_min, res_max = _active_bound(bounds, "Resolution")
+
+    # (lens 1, object distance, separation) grid, walked in chunks of lens 1
+    S = object_distances[None, :, None]
+    d = separations[None, None, :]
+    chunk = max(1, SEARCH_CHUNK_SIZE // max(1, len(object_distances) * len(separations)))
+    hits = []
+    for start in range(0, len(focal_lengths), chunk):
+        i = np.arange(start, min(start + chunk, len(focal_lengths)))[:, None, None]
+        f1, D1 = focal_lengths[i], diameters[i]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            I1 = f1 * S / (S - f1)
+            m1 = I1 / S
+            S2 = d - I1
+        resolution = 1.22 * (wavelength / D1) * S
+        keep = (resolution >= res_min) & (resolution <= res_max) & np.isfinite(S2) & (m1 != 0)
+        keep = np.broadcast_to(keep, S2.shape)
+
+        rows = np.nonzero(keep.ravel())[0]
+        if rows.size == 0:
+            continue
+        lo1, hi1, lo2, hi2 = _lens2_power_ranges(powers, S2.ravel()[rows],
+                                                 np.broadcast_to(m1, S2.shape).ravel()[rows], bounds)
+        lo_d, hi_d = _lens2_diameter_ranges(sorted_diameters, np.broadcast_to(S, S2.shape).ravel()[rows],
+                                            np.broadcast_to(d, S2.shape).ravel()[rows], bounds)
+        # Either range set holds every feasible lens 2, so search only the narrower one
+        by_diameter = (hi_d - lo_d) < np.maximum(hi1 - lo1, 0) + np.maximum(hi2 - lo2, 0)
+        hi1 = np.where(by_diameter, lo1, hi1)
+        hi2 = np.where(by_diameter, lo2, hi2)
+        hi_d = np.where(by_diameter, hi_d, lo_d)
+        for lo, hi, lens2_order in ((lo1, hi1, order), (lo2, hi2, order), (lo_d, hi_d, diameter_order)):
+            for candidate, sorted_index in _expand_ranges(lo, hi):
+                ii, ll, kk = np.unravel_index(rows[candidate], S2.shape)
+                ii = ii + start
+                jj = lens2_order[sorted_index]
+                values = two_lens_properties(focal_lengths[ii], focal_lengths[jj], separations[kk],
+                                             object_distances[ll], diameters[ii], diameters[jj], wavelength)
+                passed = np.broadcast_to(bounds_mask(values, bounds), ii.shape)
+                hits.append((ii[passed], jj[passed], kk[passed], ll[passed]))
+
+    if not hits:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+
+    i, j, k, l = (np.concatenate(column) for column in zip(*hits))
+    return _pairs_frame(catalog, separations, object_distances, i, j, k, l, wavelength)
+
+
+def _pairs_frame(catalog, separations, object_distances, i, j, k, l, wavelength):
+    """Builds the OUTPUT_COLUMNS frame for lens 1 i, lens 2 j, separation k and object distance l."""
+    focal_lengths = catalog["focal_length"].to_numpy(dtype=float)
+    diameters = catalog["diameter"].to_numpy(dtype=float)
+    parts = catalog["part_number"].to_numpy()
+    values = two_lens_properties(focal_lengths[i], focal_lengths[j], separations[k], object_distances[l],
+                                 diameters[i], diameters[j], wavelength)
+    return pd.DataFrame({
+        "Part_1": parts[i],
+        "Part_2": parts[j],
+        "f1": focal_lengths[i],
+        "f2": focal_lengths[j],
+        "D1": diameters[i],
+        "D2": diameters[j],
+        "d": separations[k],
+        "S": object_distances[l],
+        "I1": values["I1"],
+        "I2": values["I2"],
+        "M_total": values["M_total"],
+        "Resolution": values["Resolution"],
+        "Linear_FOV": values["Linear_FOV"],
+    }, columns=OUTPUT_COLUMNS)
+
+
+def brute_force_pairs(catalog, separations, object_distances, bounds, wavelength=WAVELENGTH_DEFAULT):
+    """Evaluates every catalog pair at every separation and object distance; the reference for search_pairs."""
+    focal_lengths = catalog["focal_length"].to_numpy(dtype=float)
+    diameters = catalog["diameter"].to_numpy(dtype=float)
+    separations = np.asarray(separations, dtype=float)
+    object_distances = np.asarray(object_distances, dtype=float)
+    j = np.arange(len(focal_lengths))[:, None, None]
+    l = np.arange(len(object_distances))[None, :, None]
+    k = np.arange(len(separations))[None, None, :]
+    hits = []
+    for i in range(len(focal_lengths)):
+        values = two_lens_properties(focal_lengths[i], focal_lengths[j], separations[k], object_distances[l],
+                                     diameters[i], diameters[j], wavelength)
+        shape = np.broadcast_shapes(j.shape, l.shape, k.shape)
+        jj, ll, kk = np.nonzero(np.broadcast_to(bounds_mask(values, bounds), shape))
+        hits.append((np.full(len(jj), i), jj, kk, ll))
+    i, j, k, l = (np.concatenate(column) for column in zip(*hits))
+    return _pairs_frame(catalog, separations, object_distances, i, j, k, l, wavelength)
+
+
+def check_search_pairs(n_parts=60, seed=0):
+    """
+    Checks search_pairs against brute_force_pairs on a random catalog.
+
+    Covers the bound mixes that take different pruning paths: power ranges
+    only, diameter ranges only (I2 and M_total left open), both, and all
+    four bounds together.
+
+    Raises:
+        RuntimeError: If the two searches find different designs.
+    """
+    rng = np.random.default_rng(seed)
+    catalog = pd.DataFrame({
+        "focal_length": rng.choice([-1, 1], n_parts) * rng.uniform(2, 50, n_parts),
+        "diameter": rng.uniform(0.5, 5, n_parts),
+        "part_number": [f"P{index}" for index in range(n_parts)],
+    })
+    separations = np.linspace(5, 60, 12)
+    object_distances = np.linspace(10, 200, 9)
+    bound_mixes = [
+        {"M_total": (0.1, 2.0), "I2": (5.0, 100.0)},
+        {"Resolution": (0, 1e-3), "Linear_FOV": (1, 3)},
+        {"M_total": (0.05, 1.0), "Linear_FOV": (0.5, 4)},
+        {"M_total": (0.01, 5.0), "I2": (1.0, 500.0), "Resolution": (0, 2e-3), "Linear_FOV": (0.2, 10)},
+    ]
+    for bounds in bound_mixes:
+        found, expected = (
+            sorted(zip(df["Part_1"], df["Part_2"], df["d"], df["S"]))
+            for df in (search_pairs(catalog, separations, object_distances, bounds),
+                       brute_force_pairs(catalog, separations, object_distances, bounds))
+        )
+        if found != expected:
+            raise RuntimeError(f"search_pairs found {len(found)} designs, brute force {len(expected)}, "
+                               f"for bounds {bounds}.")
+        print(f"{len(found)} designs match brute force for bounds {bounds}.")
+
+
+def save_pairs(pairs_df, output_db=None):
+    """Saves catalog pairs to a SQLite 'results' table that Refiner.py can read."""
+    if output_db is None:
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        output_db = f"catalog_pairs_{timestamp}.db"
+    conn = sqlite3.connect(output_db)
+    pairs_df.to_sql('results', conn, if_exists='replace', index=False)
+    conn.commit()
+    conn.close()
+    return output_db
+
+
+def main():
+    file_name = input("Lens catalog CSV: ").strip()
+    timer = PipelineTimer("lens_catalog")
+    try:
+        with timer.stage("load") as record:
+            catalog = load_catalog(file_name)
+            record["rows"] = len(catalog)
+    except FileNotFoundError:
+        print(f"File not found : {file_name}")
+        return
+    except ValueError as e:
+        print(e)
+        return
+
+    try:
+        d_start = float(input("Minimum lens separation (cm): "))
+        d_end = float(input("Maximum lens separation (cm): "))
+        d_step = float(input("Lens separation step (cm): "))
+        S_start = float(input("Minimum object distance (cm): "))
+        S_end = float(input("Maximum object distance (cm): "))
+        S_step = float(input("Object distance step (cm): "))
+        bounds = {column: input_range(column) for column in BOUND_COLUMNS}
+    except ValueError:
+        print("Invalid input. Please enter numeric values only.")
+        return
+
+    separations = np.arange(d_start, d_end + d_step / 2, d_step)
+    object_distances = np.arange(S_start, S_end + S_step / 2, S_step)
+    with timer.stage("search") as record:
+        pairs_df = search_pairs(catalog, separations, object_distances, bounds)
+        record["rows"] = len(pairs_df)
+    if pairs_df.empty:
+        print("No catalog pair matched the bounds.")
+        return
+    with timer.stage("save_sqlite", rows=len(pairs_df)):
+        output_db = save_pairs(pairs_df)
+    print(f"{len(pairs_df)} catalog designs saved to '{output_db}'.")
+    print(timer.summary())
+
+
+if __name__ == "__main__":
+    main()
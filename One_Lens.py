@@ -1,6 +1,9 @@
 import pandas as pd
 import math
 
+from Instrumentation import PipelineTimer
+from Spectral_Resolution import ABBE_DEFAULT, spectral_resolution, wavelength_band
+
 # Given initial conditions
 initial_magnification = float(input("Initial Magnification: "))
 initial_object_distance = float(input("Initial Object Distance: "))  # cm
@@ -9,6 +12,22 @@ initial_object_distance = float(input("Initial Object Distance: "))  # cm
 wavelength = 0.000055  # Example: 500 nm = 0.0005 cm
 aperture_diameter = float(input("Aperture Diameter: "))  # Example: 1 cm
 
+# Optional spectral band; left blank, only the 550 nm resolution is computed
+band_start = input("Spectral band start in nm (blank for 550 nm only): ").strip()
+if band_start:
+    # Checked up front, so a bad band never wastes the generate stage
+    try:
+        band_end = float(input("Spectral band end in nm: "))
+        band_steps = int(input("Number of wavelengths in the band: "))
+        abbe_number = float(input(f"Abbe number of the lens glass (blank for {ABBE_DEFAULT}): ").strip() or ABBE_DEFAULT)
+        if abbe_number <= 0:
+            raise ValueError
+        wavelengths = wavelength_band(float(band_start), band_end, band_steps)
+    except ValueError:
+        print("Invalid spectral band: please enter a positive start <= end (nm), "
+              "a positive number of wavelengths and a positive Abbe number.")
+        raise SystemExit(1)
+
 # Calculate initial image distance (I)
 I_initial = -initial_magnification * initial_object_distance
 
@@ -17,38 +36,51 @@ F = (I_initial * initial_object_distance) / (I_initial + initial_object_distance
 
 # Prepare results list
 results = []
+timer = PipelineTimer("one_lens")
 
 # Iterate over different object distances (S)
-for S in range(10, 100):  # Adjust range as needed
-    # Calculate image distance (I) for the current S maintaining the same F
-    if S + F == 0:  # Avoid division by zero
-        continue
-    I = (F * S) / (S - F)
-    
-    # Calculate magnification (M)
-    M = -I / S
-
-    # Calculate diffraction limit
-    angular_resolution_rad = 1.22 * (wavelength / aperture_diameter)  # In radians
-    angular_resolution_deg = angular_resolution_rad * (180 / math.pi)  # Convert to degrees
-    linear_resolution = angular_resolution_rad * S  # In cm
-    
-    # Store results
-    results.append({
-        "Object Distance (S)": S,
-        "Image Distance (I)": round(I, 2),
-        "Magnification (M)": round(M, 2),
-        "Focal Length (F)": round(F, 2),
-        "Angular Resolution (deg)": round(angular_resolution_deg, 6),
-        "Linear Resolution (cm)": round(linear_resolution, 6),
-    })
+with timer.stage("generate") as record:
+    for S in range(10, 100):  # Adjust range as needed
+        # Calculate image distance (I) for the current S maintaining the same F
+        if S + F == 0:  # Avoid division by zero
+            continue
+        I = (F * S) / (S - F)
+        
+        # Calculate magnification (M)
+        M = -I / S
+
+        # Calculate diffraction limit
+        angular_resolution_rad = 1.22 * (wavelength / aperture_diameter)  # In radians
+        angular_resolution_deg = angular_resolution_rad * (180 / math.pi)  # Convert to degrees
+        linear_resolution = angular_resolution_rad * S  # In cm
+        
+        # Store results
+        results.append({
+            "Object Distance (S)": S,
+            "Image Distance (I)": round(I, 2),
+            "Magnification (M)": round(M, 2),
+            "Focal Length (F)": round(F, 2),
+            "Angular Resolution (deg)": round(angular_resolution_deg, 6),
+            "Linear Resolution (cm)": round(linear_resolution, 6),
+        })
+    record["rows"] = len(results)
 
 # Convert results to a DataFrame
 df = pd.DataFrame(results)
 
+# Worst-case and weighted resolution over the band, one column each rather than one row per wavelength
+if band_start:
+    with timer.stage("spectral", rows=len(df) * len(wavelengths)):
+        spectral = spectral_resolution(F, df["Object Distance (S)"].to_numpy(), wavelengths, aperture_diameter,
+                                       abbe_number=abbe_number)
+        for column, values in spectral.items():
+            df[column] = values.round(6)
+
 # Export the DataFrame to an Excel file
 output_file = "lens_calculations_with_diffraction_degrees.xlsx"
-df.to_excel(output_file, index=False)
+with timer.stage("save_excel", rows=len(df)):
+    df.to_excel(output_file, index=False)
 
 print(f"Focal Length (F): {round(F, 2)} cm")
 print(f"Results with diffraction limits (in degrees) have been exported to '{output_file}'.")
+print(timer.summary())
@@ -3,6 +3,9 @@ from tkinter import ttk, messagebox
 import pandas as pd
 import math
 
+from Instrumentation import PipelineTimer
+from Spectral_Resolution import ABBE_DEFAULT, spectral_resolution, wavelength_band
+
 def get_float_input(prompt, entry):
     """Gets a float input from the user with error handling in GUI context."""
     try:
@@ -56,6 +59,24 @@ def calculate_lens_properties(focal_length, wavelength, aperture_diameter, objec
 
     return results
 
+def get_spectral_band():
+    """Reads the optional spectral band: (wavelengths in cm, Abbe number), (None, None) if left empty, False if invalid."""
+    if not band_start_entry.get().strip():
+        return None, None
+    try:
+        band_start = float(band_start_entry.get())
+        band_end = float(band_end_entry.get())
+        band_steps = int(band_steps_entry.get())
+        abbe_number = float(abbe_number_entry.get().strip() or ABBE_DEFAULT)
+        if band_start <= 0 or band_end < band_start or band_steps < 1 or abbe_number <= 0:
+            raise ValueError
+    except ValueError:
+        messagebox.showerror("Error", "Please enter a valid spectral band: positive start <= end (nm), "
+                                      "a positive number of wavelengths and a positive Abbe number.")
+        return False
+    return wavelength_band(band_start, band_end, band_steps), abbe_number
+
+
 def export_to_excel(df, filename="One_lens_calculations_GUI.xlsx"):
     """Exports a DataFrame to an Excel file."""
     try:
@@ -75,6 +96,10 @@ def calculate_and_export():
         return  # Exit if input is invalid
 
     wavelength = 0.000055  # cm
+    spectral_band = get_spectral_band()
+    if spectral_band is False:
+        return
+    wavelengths, abbe_number = spectral_band
     
     try:
        object_distance_start = int(object_distance_start_entry.get())
@@ -86,13 +111,24 @@ def calculate_and_export():
          messagebox.showerror("Error", "Please enter a positive integer for Object distance start and end values.")
          return
 
+    timer = PipelineTimer("one_lens_gui")
     focal_length = calculate_focal_length(initial_magnification, initial_object_distance)
-    results = calculate_lens_properties(focal_length, wavelength, aperture_diameter, object_distance_start, object_distance_end)
+    with timer.stage("generate") as record:
+        results = calculate_lens_properties(focal_length, wavelength, aperture_diameter, object_distance_start, object_distance_end)
+        record["rows"] = len(results)
     
     if results:
       df = pd.DataFrame(results)
-      export_to_excel(df)
-      messagebox.showinfo("Focal Length", f"Focal Length (F): {focal_length:.2f} cm")
+      if wavelengths is not None:
+          # Worst-case and weighted resolution over the band, one column each rather than one row per wavelength
+          with timer.stage("spectral", rows=len(df) * len(wavelengths)):
+              spectral = spectral_resolution(focal_length, df["Object Distance (S) cm"].to_numpy(), wavelengths,
+                                             aperture_diameter, abbe_number=abbe_number)
+              for column, values in spectral.items():
+                  df[column] = values.round(6)
+      with timer.stage("save_excel", rows=len(df)):
+          export_to_excel(df)
+      messagebox.showinfo("Focal Length", f"Focal Length (F): {focal_length:.2f} cm\n\n{timer.summary()}")
     else:
        messagebox.showinfo("Error", "No data to export.")
 
@@ -121,10 +157,26 @@ ttk.Label(root, text="Ending Object Distance (cm):").grid(row=4, column=0, stick
 object_distance_end_entry = ttk.Entry(root)
 object_distance_end_entry.grid(row=4, column=1, sticky=tk.E, padx=5, pady=5)
 
+ttk.Label(root, text="Spectral Band Start (nm, optional):").grid(row=5, column=0, sticky=tk.W, padx=5, pady=5)
+band_start_entry = ttk.Entry(root)
+band_start_entry.grid(row=5, column=1, sticky=tk.E, padx=5, pady=5)
+
+ttk.Label(root, text="Spectral Band End (nm):").grid(row=6, column=0, sticky=tk.W, padx=5, pady=5)
+band_end_entry = ttk.Entry(root)
+band_end_entry.grid(row=6, column=1, sticky=tk.E, padx=5, pady=5)
+
+ttk.Label(root, text="Wavelengths in Band:").grid(row=7, column=0, sticky=tk.W, padx=5, pady=5)
+band_steps_entry = ttk.Entry(root)
+band_steps_entry.grid(row=7, column=1, sticky=tk.E, padx=5, pady=5)
+
+ttk.Label(root, text="Abbe Number:").grid(row=8, column=0, sticky=tk.W, padx=5, pady=5)
+abbe_number_entry = ttk.Entry(root)
+abbe_number_entry.grid(row=8, column=1, sticky=tk.E, padx=5, pady=5)
+abbe_number_entry.insert(0, str(ABBE_DEFAULT))
 
 # --- Calculation Button ---
 calculate_button = ttk.Button(root, text="Calculate and Export", command=calculate_and_export)
-calculate_button.grid(row=5, column=0, columnspan=2, pady=10)
+calculate_button.grid(row=9, column=0, columnspan=2, pady=10)
 
 
 root.mainloop()
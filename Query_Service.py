@@ -0,0 +1,349 @@
+import argparse
+import asyncio
+import csv
+import io
+import json
+import math
+import os
+import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from urllib.parse import parse_qs, quote, urlsplit
+
+import matplotlib
+
+matplotlib.use("Agg")  # Plots are rendered to PNG, never shown
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from Ray_Tracer import OBJECT_HEIGHT_DEFAULT, ray_trace_and_plot
+from Two_Lens_System import BOUND_COLUMNS, DESIGN_COLUMNS, two_lens_properties
+
+# --- Constants ---
+HOST_DEFAULT = "127.0.0.1"
+PORT_DEFAULT = 8765
+POOL_SIZE = 4  # Read-only connections per database
+PAGE_SIZE_DEFAULT = 1000
+PAGE_SIZE_MAX = 50_000
+NEAREST_DEFAULT = 10
+MMAP_SIZE = 1 << 30  # Let SQLite read through the OS page cache, shared by every connection
+IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               500: "Internal Server Error"}
+
+
+# --- Classes ---
+
+class ServiceError(Exception):
+    """Raised by request handlers to answer with an HTTP error status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ReadOnlyPool:
+    """
+    A fixed pool of read-only SQLite connections to one database.
+
+    The database is switched to WAL mode once (when the file is writable), so
+    readers never block a generator that is still appending to it. Each
+    connection is handed to one executor thread at a time.
+    """
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.path = path
+        self._enable_wal()
+        self._queue = asyncio.Queue()
+        for _ in range(size):
+            self._queue.put_nowait(self._connect())
+
+    def _enable_wal(self):
+        try:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.close()
+        except sqlite3.Error:
+            pass  # Read-only media: serve it in its current journal mode
+
+    def _connect(self):
+        conn = sqlite3.connect(f"file:{quote(self.path)}?mode=ro", uri=True, check_same_thread=False)
+        conn.execute("PRAGMA query_only=1")
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        return conn
+
+    @asynccontextmanager
+    async def connection(self):
+        conn = await self._queue.get()
+        try:
+            yield conn
+        finally:
+            self._queue.put_nowait(conn)
+
+    def close(self):
+        while not self._queue.empty():
+            self._queue.get_nowait().close()
+
+
+class QueryService:
+    """
+    Localhost HTTP/JSON service over the results databases in one directory.
+
+    Endpoints (GET):
+        /refine    Rows inside the Refiner bounds (min_M_total, max_M_total,
+                   ...), paginated by cursor as JSON, or streamed whole as CSV
+                   with format=csv.
+        /nearest   The k designs closest to target M_total, I2, Resolution
+                   and Linear_FOV values.
+        /raytrace  Image positions and magnification of a two-lens design;
+                   format=png returns Ray_Tracer's plot instead.
+
+    /refine and /nearest take db (file name inside the served directory) and
+    table (default "results"). SQLite work runs on an executor, so the event
+    loop keeps serving other clients while a query scans.
+    """
+
+    def __init__(self, root_dir, workers=POOL_SIZE):
+        self.root_dir = os.path.abspath(root_dir)
+        self.pools = {}
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="query")
+        # pyplot is not thread-safe: every plot is drawn on the same thread
+        self.plot_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="plot")
+        self.routes = {"/refine": self.refine, "/nearest": self.nearest, "/raytrace": self.raytrace}
+
+    # --- Plumbing ---
+
+    def _pool(self, params):
+        db_name = params.get("db")
+        if not db_name:
+            raise ServiceError(400, "Parameter 'db' is required.")
+        path = os.path.abspath(os.path.join(self.root_dir, db_name))
+        if os.path.dirname(path) != self.root_dir or not os.path.isfile(path):
+            raise ServiceError(404, f"Database '{db_name}' not found.")
+        if path not in self.pools:
+            self.pools[path] = ReadOnlyPool(path)
+        return self.pools[path]
+
+    def _table(self, params):
+        table_name = params.get("table", "results")
+        if not IDENTIFIER.match(table_name):
+            raise ServiceError(400, f"Invalid table name '{table_name}'.")
+        return table_name
+
+    async def _run(self, pool, query, *args):
+        """Runs query(conn, *args) on the executor with a pooled connection."""
+        loop = asyncio.get_running_loop()
+        async with pool.connection() as conn:
+            return await loop.run_in_executor(self.executor, query, conn, *args)
+
+    async def handle(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass  # Headers are not needed
+            if len(request_line) < 2:
+                return
+            if request_line[0] != "GET":
+                raise ServiceError(405, "Only GET is supported.")
+            url = urlsplit(request_line[1])
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            if url.path not in self.routes:
+                raise ServiceError(404, f"Unknown endpoint '{url.path}'.")
+            await self.routes[url.path](params, writer)
+        except ServiceError as e:
+            await _send(writer, e.status, "application/json", json.dumps({"error": str(e)}).encode())
+        except (ValueError, sqlite3.OperationalError) as e:
+            await _send(writer, 400, "application/json", json.dumps({"error": str(e)}).encode())
+        except ZeroDivisionError:
+            # A client-chosen design the lens equations cannot evaluate
+            await _send(writer, 400, "application/json",
+                        json.dumps({"error": "Singular design: the lens equations divide by zero."}).encode())
+        except ConnectionError:
+            pass  # Client went away mid-stream
+        except Exception as e:
+            await _send(writer, 500, "application/json", json.dumps({"error": str(e)}).encode())
+        finally:
+            writer.close()
+
+    # --- Endpoints ---
+
+    async def refine(self, params, writer):
+        pool, table_name = self._pool(params), self._table(params)
+        bounds = _bounds_from_params(params)
+        if params.get("format", "json") == "csv":
+            await self._stream_csv(pool, table_name, bounds, writer)
+            return
+
+        page_size = max(1, min(int(params.get("page_size", PAGE_SIZE_DEFAULT)), PAGE_SIZE_MAX))
+        cursor = int(params.get("cursor", 0))
+        columns, rows = await self._run(pool, _refine_page, table_name, bounds, cursor, page_size)
+        next_cursor = rows[-1][0] if len(rows) == page_size else None
+        body = {
+            "columns": columns[1:],
+            "rows": [[_json_value(value) for value in row[1:]] for row in rows],
+            "next_cursor": next_cursor,
+        }
+        await _send(writer, 200, "application/json", json.dumps(body).encode())
+
+    async def _stream_csv(self, pool, table_name, bounds, writer):
+        """
+        Streams every matching row as chunked CSV, one page per executor call.
+
+        The first page is read before the 200 header goes out, so a bad
+        query still gets a normal error response. A failure after that
+        cannot be reported in-band; the connection is dropped with the body
+        unterminated, so the client sees an incomplete transfer rather than
+        a short CSV.
+        """
+        columns, rows = await self._run(pool, _refine_page, table_name, bounds, 0, PAGE_SIZE_MAX)
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/csv\r\nTransfer-Encoding: chunked\r\n"
+                     b"Connection: close\r\n\r\n")
+        header_sent = False
+        try:
+            while True:
+                buffer = io.StringIO()
+                csv_writer = csv.writer(buffer)
+                if not header_sent:
+                    csv_writer.writerow(columns[1:])
+                    header_sent = True
+                csv_writer.writerows(row[1:] for row in rows)
+                _write_chunk(writer, buffer.getvalue().encode())
+                await writer.drain()  # Back-pressure: a slow client pauses the scan
+                if len(rows) < PAGE_SIZE_MAX:
+                    break
+                columns, rows = await self._run(pool, _refine_page, table_name, bounds, rows[-1][0], PAGE_SIZE_MAX)
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        except ConnectionError:
+            raise
+        except Exception as e:
+            print(f"CSV stream for '{table_name}' aborted: {e}")
+            writer.transport.abort()
+
+    async def nearest(self, params, writer):
+        pool, table_name = self._pool(params), self._table(params)
+        targets = {column: float(params[column]) for column in BOUND_COLUMNS if column in params}
+        if not targets:
+            raise ServiceError(400, f"Give at least one target among {', '.join(BOUND_COLUMNS)}.")
+        k = max(1, min(int(params.get("k", NEAREST_DEFAULT)), PAGE_SIZE_MAX))
+        columns, rows = await self._run(pool, _nearest_rows, table_name, targets, k)
+        body = {"columns": columns, "rows": [[_json_value(value) for value in row] for row in rows]}
+        await _send(writer, 200, "application/json", json.dumps(body).encode())
+
+    async def raytrace(self, params, writer):
+        try:
+            f1, f2, d, u1 = (float(params[name]) for name in DESIGN_COLUMNS)
+        except KeyError as e:
+            raise ServiceError(400, f"Parameter {e} is required.")
+        if u1 == 0:
+            raise ServiceError(400, "Parameter 'S' must be non-zero.")
+        object_height = float(params.get("object_height", OBJECT_HEIGHT_DEFAULT))
+        loop = asyncio.get_running_loop()
+        if params.get("format", "json") == "png":
+            png = await loop.run_in_executor(self.plot_executor, _ray_trace_png, f1, f2, d, u1, object_height)
+            await _send(writer, 200, "image/png", png)
+            return
+
+        # Same relations as the generator (two_lens_properties), so the numbers match the
+        # I1, I2 and M_total stored for this design in the databases served by /refine
+        values = two_lens_properties(np.float64(f1), np.float64(f2), np.float64(d), np.float64(u1), 1.0, 1.0)
+        body = {
+            "image1_distance": _json_value(float(values["I1"])),
+            "image2_distance": _json_value(float(values["I2"])),
+            "image2_position": _json_value(float(d + values["I2"])),
+            "total_magnification": _json_value(float(values["M_total"])),
+        }
+        await _send(writer, 200, "application/json", json.dumps(body).encode())
+
+    async def serve(self, host=HOST_DEFAULT, port=PORT_DEFAULT):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving results databases in '{self.root_dir}' on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for pool in self.pools.values():
+                pool.close()
+            self.executor.shutdown()
+            self.plot_executor.shutdown()
+
+
+# --- Functions ---
+
+def _bounds_from_params(params):
+    """Reads min_<column>/max_<column> pairs; like the Refiner GUI, a bound applies only when both are given."""
+    bounds = {}
+    for column in BOUND_COLUMNS:
+        min_val, max_val = params.get(f"min_{column}"), params.get(f"max_{column}")
+        if min_val is not None and max_val is not None:
+            bounds[column] = (float(min_val), float(max_val))
+    return bounds
+
+
+def _refine_page(conn, table_name, bounds, cursor, page_size):
+    """One keyset page of rows inside the bounds; the first column is the rowid cursor."""
+    where, args = ["rowid > ?"], [cursor]
+    for column, (min_val, max_val) in bounds.items():
+        where.append(f'ABS("{column}") BETWEEN ? AND ?')
+        args += [min_val, max_val]
+    query = (f'SELECT rowid AS _cursor, * FROM "{table_name}" WHERE {" AND ".join(where)} '
+             f'ORDER BY rowid LIMIT ?')
+    result = conn.execute(query, args + [page_size])
+    return [description[0] for description in result.description], result.fetchall()
+
+
+def _nearest_rows(conn, table_name, targets, k):
+    """The k rows with the smallest relative distance to the targets, compared on |value|."""
+    terms, args = [], []
+    for column, target in targets.items():
+        scale = abs(target) or 1.0
+        terms.append(f'((ABS("{column}") - ?) / ?) * ((ABS("{column}") - ?) / ?)')
+        args += [abs(target), scale, abs(target), scale]
+    query = (f'SELECT *, {" + ".join(terms)} AS distance FROM "{table_name}" '
+             f'ORDER BY distance IS NULL, distance LIMIT ?')
+    result = conn.execute(query, args + [k])
+    return [description[0] for description in result.description], result.fetchall()
+
+
+def _ray_trace_png(f1, f2, d, u1, object_height):
+    fig, _ = ray_trace_and_plot(f1, f2, d, u1, object_height)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def _json_value(value):
+    """JSON has no inf/NaN; send them as null."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _write_chunk(writer, data):
+    if data:
+        writer.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+
+
+async def _send(writer, status, content_type, body):
+    writer.write(f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\nContent-Type: {content_type}\r\n"
+                 f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve results databases over a local HTTP/JSON API.")
+    parser.add_argument("--root", default=".", help="Directory holding the .db files to serve")
+    parser.add_argument("--host", default=HOST_DEFAULT)
+    parser.add_argument("--port", type=int, default=PORT_DEFAULT)
+    args = parser.parse_args()
+    try:
+        asyncio.run(QueryService(args.root).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("Service stopped.")
+
+
+if __name__ == "__main__":
+    main()
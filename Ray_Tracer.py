@@ -202,109 +202,110 @@ def save_image():
     except Exception as e:
         print(f"Error saving image: {e}")
 
-# --- GUI Setup ---
-
-root = tk.Tk()
-root.title("Ray Tracing Two-Lens System with Image Simulation")
-
-# Input frame
-frame_input = ttk.Frame(root, padding="10")
-frame_input.grid(row=0, column=0, sticky="ew")
-
-# Input validation function
-def validate_positive_number(value):
-    """Validates that the input is a positive number or empty."""
-    if value.replace('.', '', 1).isdigit() and float(value) >= 0:
-        return True
-    elif value == "":
-        return True
-    return False
-
-vcmd = (root.register(validate_positive_number), '%P')
-
-# --- Sliders and Entry Fields ---
-
-# Focal Length Lens 1
-ttk.Label(frame_input, text="Focal Length Lens 1 (mm):").grid(row=0, column=0, sticky="w")
-slider_f1 = ttk.Scale(frame_input, from_=1, to=100, orient=tk.HORIZONTAL,
-                     command=lambda val: entry_f1.delete(0, tk.END) or entry_f1.insert(0, f"{float(val):.1f}"))
-slider_f1.grid(row=0, column=1, padx=5, pady=5)
-slider_f1.set(FOCAL_LENGTH_LENS1_DEFAULT)
-entry_f1 = ttk.Entry(frame_input, width=5, validate="key", validatecommand=vcmd)
-entry_f1.grid(row=0, column=2, padx=5, pady=5)
-entry_f1.insert(0, str(FOCAL_LENGTH_LENS1_DEFAULT))
-
-# Focal Length Lens 2
-ttk.Label(frame_input, text="Focal Length Lens 2 (mm):").grid(row=1, column=0, sticky="w")
-slider_f2 = ttk.Scale(frame_input, from_=1, to=100, orient=tk.HORIZONTAL,
-                     command=lambda val: entry_f2.delete(0, tk.END) or entry_f2.insert(0, f"{float(val):.1f}"))
-slider_f2.grid(row=1, column=1, padx=5, pady=5)
-slider_f2.set(FOCAL_LENGTH_LENS2_DEFAULT)
-entry_f2 = ttk.Entry(frame_input, width=5, validate="key", validatecommand=vcmd)
-entry_f2.grid(row=1, column=2, padx=5, pady=5)
-entry_f2.insert(0, str(FOCAL_LENGTH_LENS2_DEFAULT))
-
-# Lens Separation
-ttk.Label(frame_input, text="Lens Separation (mm):").grid(row=2, column=0, sticky="w")
-slider_d = ttk.Scale(frame_input, from_=1, to=200, orient=tk.HORIZONTAL,
-                    command=lambda val: entry_d.delete(0, tk.END) or entry_d.insert(0, f"{float(val):.1f}"))
-slider_d.grid(row=2, column=1, padx=5, pady=5)
-slider_d.set(LENS_SEPARATION_DEFAULT)
-entry_d = ttk.Entry(frame_input, width=5, validate="key", validatecommand=vcmd)
-entry_d.grid(row=2, column=2, padx=5, pady=5)
-entry_d.insert(0, str(LENS_SEPARATION_DEFAULT))
-
-# Object Distance
-ttk.Label(frame_input, text="Object Distance (mm):").grid(row=3, column=0, sticky="w")
-slider_u1 = ttk.Scale(frame_input, from_=1, to=500, orient=tk.HORIZONTAL,
-                     command=lambda val: entry_u1.delete(0, tk.END) or entry_u1.insert(0, f"{float(val):.1f}"))
-slider_u1.grid(row=3, column=1, padx=5, pady=5)
-slider_u1.set(OBJECT_DISTANCE_DEFAULT)
-entry_u1 = ttk.Entry(frame_input, width=5, validate="key", validatecommand=vcmd)
-entry_u1.grid(row=3, column=2, padx=5, pady=5)
-entry_u1.insert(0, str(OBJECT_DISTANCE_DEFAULT))
-
-# Object Height
-ttk.Label(frame_input, text="Object Height (mm):").grid(row=4, column=0, sticky="w")
-slider_obj_height = ttk.Scale(frame_input, from_=1, to=20, orient=tk.HORIZONTAL,
-                              command=lambda val: entry_obj_height.delete(0, tk.END) or entry_obj_height.insert(0,
-                                                                                                                  f"{float(val):.1f}"))
-slider_obj_height.grid(row=4, column=1, padx=5, pady=5)
-slider_obj_height.set(OBJECT_HEIGHT_DEFAULT)
-entry_obj_height = ttk.Entry(frame_input, width=5, validate="key", validatecommand=vcmd)
-entry_obj_height.grid(row=4, column=2, padx=5, pady=5)
-entry_obj_height.insert(0, str(OBJECT_HEIGHT_DEFAULT))
-
-# Update Button
-ttk.Button(frame_input, text="Update Plot & Image", command=update_plot_and_image).grid(row=5, column=0,
-                                                                                        columnspan=3, pady=10)
-
-# Result label
-result_label = ttk.Label(frame_input, text="")
-result_label.grid(row=6, column=0, columnspan=3)
-
-# Save Image Button
-save_button = ttk.Button(frame_input, text="Save Image", command=save_image)
-save_button.grid(row=7, column=0, columnspan=3, pady=5)
-
-# --- Plot Frame ---
-frame_plot = ttk.Frame(root)
-frame_plot.grid(row=0, column=1, sticky="nsew")
-
-# --- Image Simulation Frame ---
-frame_image = ttk.Frame(root)
-frame_image.grid(row=1, column=1, sticky="nsew")
-ttk.Label(frame_image, text="Simulated Image View").pack()
-image_label = ttk.Label(frame_image)
-image_label.pack()
-
-# --- Configure Grid Weights ---
-root.columnconfigure(1, weight=1)
-root.rowconfigure(0, weight=1)
-root.rowconfigure(1, weight=1)
-
-# --- Initial plot and image ---
-update_plot_and_image()
-
-# --- Start GUI ---
-root.mainloop()
+if __name__ == "__main__":
+    # --- GUI Setup ---
+
+    root = tk.Tk()
+    root.title("Ray Tracing Two-Lens System with Image Simulation")
+
+    # Input frame
+    frame_input = ttk.Frame(root, padding="10")
+    frame_input.grid(row=0, column=0, sticky="ew")
+
+    # Input validation function
+    def validate_positive_number(value):
+        """Validates that the input is a positive number or empty."""
+        if value.replace('.', '', 1).isdigit() and float(value) >= 0:
+            return True
+        elif value == "":
+            return True
+        return False
+
+    vcmd = (root.register(validate_positive_number), '%P')
+
+    # --- Sliders and Entry Fields ---
+
+    # Focal Length Lens 1
+    ttk.Label(frame_input, text="Focal Length Lens 1 (mm):").grid(row=0, column=0, sticky="w")
+    slider_f1 = ttk.Scale(frame_input, from_=1, to=100, orient=tk.HORIZONTAL,
+                         command=lambda val: entry_f1.delete(0, tk.END) or entry_f1.insert(0, f"{float(val):.1f}"))
+    slider_f1.grid(row=0, column=1, padx=5, pady=5)
+    slider_f1.set(FOCAL_LENGTH_LENS1_DEFAULT)
+    entry_f1 = ttk.Entry(frame_input, width=5, validate="key", validatecommand=vcmd)
+    entry_f1.grid(row=0, column=2, padx=5, pady=5)
+    entry_f1.insert(0, str(FOCAL_LENGTH_LENS1_DEFAULT))
+
+    # Focal Length Lens 2
+    ttk.Label(frame_input, text="Focal Length Lens 2 (mm):").grid(row=1, column=0, sticky="w")
+    slider_f2 = ttk.Scale(frame_input, from_=1, to=100, orient=tk.HORIZONTAL,
+                         command=lambda val: entry_f2.delete(0, tk.END) or entry_f2.insert(0, f"{float(val):.1f}"))
+    slider_f2.grid(row=1, column=1, padx=5, pady=5)
+    slider_f2.set(FOCAL_LENGTH_LENS2_DEFAULT)
+    entry_f2 = ttk.Entry(frame_input, width=5, validate="key", validatecommand=vcmd)
+    entry_f2.grid(row=1, column=2, padx=5, pady=5)
+    entry_f2.insert(0, str(FOCAL_LENGTH_LENS2_DEFAULT))
+
+    # Lens Separation
+    ttk.Label(frame_input, text="Lens Separation (mm):").grid(row=2, column=0, sticky="w")
+    slider_d = ttk.Scale(frame_input, from_=1, to=200, orient=tk.HORIZONTAL,
+                        command=lambda val: entry_d.delete(0, tk.END) or entry_d.insert(0, f"{float(val):.1f}"))
+    slider_d.grid(row=2, column=1, padx=5, pady=5)
+    slider_d.set(LENS_SEPARATION_DEFAULT)
+    entry_d = ttk.Entry(frame_input, width=5, validate="key", validatecommand=vcmd)
+    entry_d.grid(row=2, column=2, padx=5, pady=5)
+    entry_d.insert(0, str(LENS_SEPARATION_DEFAULT))
+
+    # Object Distance
+    ttk.Label(frame_input, text="Object Distance (mm):").grid(row=3, column=0, sticky="w")
+    slider_u1 = ttk.Scale(frame_input, from_=1, to=500, orient=tk.HORIZONTAL,
+                         command=lambda val: entry_u1.delete(0, tk.END) or entry_u1.insert(0, f"{float(val):.1f}"))
+    slider_u1.grid(row=3, column=1, padx=5, pady=5)
+    slider_u1.set(OBJECT_DISTANCE_DEFAULT)
+    entry_u1 = ttk.Entry(frame_input, width=5, validate="key", validatecommand=vcmd)
+    entry_u1.grid(row=3, column=2, padx=5, pady=5)
+    entry_u1.insert(0, str(OBJECT_DISTANCE_DEFAULT))
+
+    # Object Height
+    ttk.Label(frame_input, text="Object Height (mm):").grid(row=4, column=0, sticky="w")
+    slider_obj_height = ttk.Scale(frame_input, from_=1, to=20, orient=tk.HORIZONTAL,
+                                  command=lambda val: entry_obj_height.delete(0, tk.END) or entry_obj_height.insert(0,
+                                                                                                                      f"{float(val):.1f}"))
+    slider_obj_height.grid(row=4, column=1, padx=5, pady=5)
+    slider_obj_height.set(OBJECT_HEIGHT_DEFAULT)
+    entry_obj_height = ttk.Entry(frame_input, width=5, validate="key", validatecommand=vcmd)
+    entry_obj_height.grid(row=4, column=2, padx=5, pady=5)
+    entry_obj_height.insert(0, str(OBJECT_HEIGHT_DEFAULT))
+
+    # Update Button
+    ttk.Button(frame_input, text="Update Plot & Image", command=update_plot_and_image).grid(row=5, column=0,
+                                                                                            columnspan=3, pady=10)
+
+    # Result label
+    result_label = ttk.Label(frame_input, text="")
+    result_label.grid(row=6, column=0, columnspan=3)
+
+    # Save Image Button
+    save_button = ttk.Button(frame_input, text="Save Image", command=save_image)
+    save_button.grid(row=7, column=0, columnspan=3, pady=5)
+
+    # --- Plot Frame ---
+    frame_plot = ttk.Frame(root)
+    frame_plot.grid(row=0, column=1, sticky="nsew")
+
+    # --- Image Simulation Frame ---
+    frame_image = ttk.Frame(root)
+    frame_image.grid(row=1, column=1, sticky="nsew")
+    ttk.Label(frame_image, text="Simulated Image View").pack()
+    image_label = ttk.Label(frame_image)
+    image_label.pack()
+
+    # --- Configure Grid Weights ---
+    root.columnconfigure(1, weight=1)
+    root.rowconfigure(0, weight=1)
+    root.rowconfigure(1, weight=1)
+
+    # --- Initial plot and image ---
+    update_plot_and_image()
+
+    # --- Start GUI ---
+    root.mainloop()
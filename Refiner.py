@@ -4,24 +4,32 @@ from sympy import symbols, Eq, solve
 import sqlite3
 from datetime import datetime
 
-def refine_results(file_name, is_sqlite=False, table_name=None) :
+from Excel_Export import frame_chunks, write_excel_streaming
+from Instrumentation import PipelineTimer, TIMING_LOG_DEFAULT
+
+def refine_results(file_name, is_sqlite=False, table_name=None, timing_log=None) :
+    timer = PipelineTimer("refine", log_file=timing_log)
     try:
-        # Load the data based on file type
-        if is_sqlite:
-            if not table_name :
-                raise ValueError("Table name must be provided for SQLite database.")
-            # Connect to the SQLite database
-            conn = sqlite3.connect(file_name)
-            df = pd.read_sql(f"SELECT * FROM {table_name}", conn)
-            conn.close()
-        else:
-            # Load the Excel file
-            df = pd.read_excel(file_name)
+        with timer.stage("load") as record:
+            # Load the data based on file type
+            if is_sqlite:
+                if not table_name :
+                    raise ValueError("Table name must be provided for SQLite database.")
+                # Connect to the SQLite database
+                conn = sqlite3.connect(file_name)
+                df = pd.read_sql(f"SELECT * FROM {table_name}", conn)
+                conn.close()
+            else:
+                # Load the Excel file
+                df = pd.read_excel(file_name)
+            record["rows"] = len(df)
     except FileNotFoundError :
         print(f"File not found : {file_name}")
+        timer.write_log()
         return []
     except Exception as e :
         print(f"An error occurred while reading the file: {e}")
+        timer.write_log()
         return []
     
     try :
@@ -41,20 +49,21 @@ def refine_results(file_name, is_sqlite=False, table_name=None) :
 
     refined_results = []
 
-    for _, result in df.iterrows():
-        try:
-            # Ensure M_total and I2 are valid numbers
-            M_total = result['M_total']
-            I2 = result['I2']
-            Resolution = result['Resolution']
-            Linear_FOV = result['Linear_FOV']
-            # Check the filtering conditions
-            if min_magnification <= abs(M_total) <= max_magnification and min_I2 <= abs(I2) <= max_I2 and min_Resolution <= abs(Resolution) <= max_Resolution and min_Linear_FOV <= abs(Linear_FOV) <= max_Linear_FOV: 
-                refined_results.append(result)
-        except KeyError:
-            print("Invalid result entry: missing 'M_total' or 'I2' or 'Resolution'. Skipping...")
-        except TypeError:
-            print(f"Invalid data type in result: {result}. Skipping...")
+    with timer.stage("filter", rows=len(df)):
+        for _, result in df.iterrows():
+            try:
+                # Ensure M_total and I2 are valid numbers
+                M_total = result['M_total']
+                I2 = result['I2']
+                Resolution = result['Resolution']
+                Linear_FOV = result['Linear_FOV']
+                # Check the filtering conditions
+                if min_magnification <= abs(M_total) <= max_magnification and min_I2 <= abs(I2) <= max_I2 and min_Resolution <= abs(Resolution) <= max_Resolution and min_Linear_FOV <= abs(Linear_FOV) <= max_Linear_FOV: 
+                    refined_results.append(result)
+            except KeyError:
+                print("Invalid result entry: missing 'M_total' or 'I2' or 'Resolution'. Skipping...")
+            except TypeError:
+                print(f"Invalid data type in result: {result}. Skipping...")
 
     # Convert the refined results back to a DataFrame
     refined_df = pd.DataFrame(refined_results)
@@ -62,50 +71,58 @@ def refine_results(file_name, is_sqlite=False, table_name=None) :
     try:
     # Save the refined results to a new Excel file
         output_file = f"refined_results_{timestamp}.xlsx"
-        refined_df.to_excel(output_file, index=False)
-        print(f"Refined results saved to '{output_file}'.")
+        with timer.stage("save_excel", rows=len(refined_df)):
+            rows, sheets = write_excel_streaming(frame_chunks(refined_df), output_file)
+        print(f"Refined results saved to '{output_file}' ({rows} rows, {sheets} sheet(s)).")
     except Exception as e:
         print(f"An error occurred while saving the refined results as excel: {e}")
     # Save the refined results to a new database file
     try:
         output_db = f"refined_results_{timestamp}.db"
-        conn = sqlite3.connect(output_db)
-        refined_df.to_sql('results', conn, if_exists='replace', index=False)
-        conn.commit()
-        conn.close()
+        with timer.stage("save_sqlite", rows=len(refined_df)):
+            conn = sqlite3.connect(output_db)
+            refined_df.to_sql('results', conn, if_exists='replace', index=False)
+            conn.commit()
+            conn.close()
         print(f"Refined results saved to '{output_db}'.")
     except Exception as e:
         print(f"An error occurred while saving the refined results as database: {e}")
 
+    print(timer.summary())
+    timer.write_log()
+
     return refined_results
 
-# Example usage:
-# Get user input for SQLite and table name
-is_sqlite_input = input("Is the file an SQLite database? (True/False): ").strip().lower()
-is_sqlite = is_sqlite_input in ["true", "True", "yes", "Yes" , "y" , "Y" , "T" , "t"]
+if __name__ == "__main__":
+    # Example usage:
+    # Get user input for SQLite and table name
+    is_sqlite_input = input("Is the file an SQLite database? (True/False): ").strip().lower()
+    is_sqlite = is_sqlite_input in ["true", "True", "yes", "Yes" , "y" , "Y" , "T" , "t"]
+    log_timings = input(f"Append stage timings to {TIMING_LOG_DEFAULT}? (y/n): ").strip().lower() in ["y", "yes"]
+    timing_log = TIMING_LOG_DEFAULT if log_timings else None
 
-table_name = "results"
-db_name = "refined_results.db"
-refined_results_processed = False
-if is_sqlite:
+    table_name = "results"
+    db_name = "refined_results.db"
+    refined_results_processed = False
+    if is_sqlite:
 
-    # Call the function
-    try :
-        if db_name == "refined_results.db" :
-            refine_results("refined_results.db", is_sqlite=is_sqlite, table_name=table_name)
-            refined_results_processed = True
-            print("Refined results processed.")
+        # Call the function
+        try :
+            if db_name == "refined_results.db" :
+                refine_results("refined_results.db", is_sqlite=is_sqlite, table_name=table_name, timing_log=timing_log)
+                refined_results_processed = True
+                print("Refined results processed.")
 
-    except FileNotFoundError :
-        print(f"File not found : {db_name}")
-    if not refined_results_processed :
-            print("Refined results not processed. Processing lens_calculations_raw_results.db")
-            try :
-                refine_results("lens_calculations_raw_results.db", is_sqlite=is_sqlite, table_name=table_name)                
-                print("Lens_calculations_raw_results.db processed.")
+        except FileNotFoundError :
+            print(f"File not found : {db_name}")
+        if not refined_results_processed :
+                print("Refined results not processed. Processing lens_calculations_raw_results.db")
+                try :
+                    refine_results("lens_calculations_raw_results.db", is_sqlite=is_sqlite, table_name=table_name, timing_log=timing_log)                
+                    print("Lens_calculations_raw_results.db processed.")
 
-            except FileNotFoundError :
-                print(f"File not found : lens_calculations_raw_results.db")
+                except FileNotFoundError :
+                    print(f"File not found : lens_calculations_raw_results.db")
         
-else :
-    refine_results("lens_calculations_raw_results.xlsx")
+    else :
+        refine_results("lens_calculations_raw_results.xlsx", timing_log=timing_log)
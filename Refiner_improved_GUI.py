@@ -2,14 +2,24 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import pandas as pd
 from datetime import datetime
+import os
+import queue
 import sqlite3
+import threading
+
+from Density_Overview import OVERVIEW_PAIRS, DensityOverview, DensityOverviewWindow
+from Excel_Export import frame_chunks, sqlite_chunks, start_excel_export
+from Instrumentation import PipelineTimer, TIMING_LOG_DEFAULT
+from Results_Browser import ResultsBrowser
+
+EXPORT_POLL_MS = 200  # How often the GUI checks on a background Excel export
 
 class DataRefinerGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("Data Refiner")
         self.root.geometry("600x600")
-        self.root.grid_rowconfigure(11, weight=1)  # Ensure status label can grow vertically
+        self.root.grid_rowconfigure(12, weight=1)  # Ensure status label can grow vertically
         self.root.grid_columnconfigure(1, weight=1)  # Allow the column with entry boxes to expand
 
         # Variables to store user inputs
@@ -24,6 +34,12 @@ class DataRefinerGUI:
         self.max_resolution = tk.StringVar()
         self.min_linear_fov = tk.StringVar()
         self.max_linear_fov = tk.StringVar()
+        self.log_timings = tk.BooleanVar(value=False)
+        self.timer = None
+        self._overviews = {}  # Cached DensityOverview per dataset
+        self._overview_window = None
+        self.refined_df = None  # Last refined results, kept for the browser
+        self._browser = None
 
         self._create_widgets()
         
@@ -66,12 +82,22 @@ class DataRefinerGUI:
         ttk.Label(self.root, text="Max Linear_FOV:").grid(row=9, column=0, sticky="w", padx=5, pady=5)
         ttk.Entry(self.root, textvariable=self.max_linear_fov).grid(row=9, column=1, sticky="ew", padx=5, pady=5)
 
+        # Timing log Checkbox
+        ttk.Checkbutton(self.root, text="Log timings", variable=self.log_timings).grid(row=10, column=0, sticky="w", padx=5, pady=5)
+
         # Process Button
-        ttk.Button(self.root, text="Process Data", command=self._process_data).grid(row=10, column=1, pady=20, sticky="ew")
+        self.process_button = ttk.Button(self.root, text="Process Data", command=self._process_data)
+        self.process_button.grid(row=10, column=1, pady=20, sticky="ew")
+
+        # Overview Button
+        ttk.Button(self.root, text="Overview", command=self._show_overview).grid(row=10, column=2, padx=5, pady=20)
+
+        # Browse Button
+        ttk.Button(self.root, text="Browse Results", command=self._show_browser).grid(row=11, column=2, padx=5, pady=5)
 
         # Status label
         self.status_label = ttk.Label(self.root, text="", wraplength=500)
-        self.status_label.grid(row=11, column=0, columnspan=3, sticky="ew", padx=5, pady=5)
+        self.status_label.grid(row=12, column=0, columnspan=3, sticky="ew", padx=5, pady=5)
 
     def _on_window_resize(self, event):
         self.root.update_idletasks()
@@ -94,6 +120,7 @@ class DataRefinerGUI:
             self.table_name.set("results")  # Reset table name to default
 
     def _process_data(self):
+        self.refined_df = None  # Browse Results only ever shows the latest successful run
         self.status_label.config(text="Processing...")
         self.root.update()  # Update the status label right away
 
@@ -111,27 +138,112 @@ class DataRefinerGUI:
             self._update_status("Please enter a table name")
             return
 
+        self.timer = PipelineTimer("refine_gui", log_file=TIMING_LOG_DEFAULT if self.log_timings.get() else None)
         try:
-            df = self._load_data(file_name, is_sqlite, table_name)
+            with self.timer.stage("load") as record:
+                df = self._load_data(file_name, is_sqlite, table_name)
+                record["rows"] = None if df is None else len(df)
             if df is None:
-                self._update_status("Data load failed.")
+                self._end_run("Data load failed.")
                 return
 
-            filtered_df = self._filter_data(df)
+            with self.timer.stage("filter", rows=len(df)):
+                filtered_df = self._filter_data(df)
             if filtered_df is None:
-                self._update_status("Data filter failed")
+                self._end_run("Data filter failed")
                 return
 
             if filtered_df.empty:
-                self._update_status("No data matched the filtering criteria.")
+                self._end_run("No data matched the filtering criteria.")
                 return
 
+            self.refined_df = filtered_df
             self._save_results(filtered_df)
-            self._update_status("Data processing complete.")
 
         except Exception as e:
             self._show_error("An unexpected error occurred.", str(e))
-            self._update_status("Data processing failed with an unexpected error")
+            self._end_run("Data processing failed with an unexpected error")
+
+    def _end_run(self, message):
+        """Ends a run that stops before the Excel export, still logging and showing its timings."""
+        self.timer.write_log()
+        self._update_status(f"{message}\n{self.timer.summary()}")
+
+    def _show_browser(self):
+        if self.refined_df is None:
+            self._show_error("Browse Error", "No refined results to browse. Please process data first")
+            return
+        if self._browser is not None and self._browser.top.winfo_exists():
+            self._browser.close()
+        self._browser = ResultsBrowser(self.root, self.refined_df)
+
+    def _show_overview(self):
+        file_name = self.file_path.get()
+        is_sqlite = self.is_sqlite.get()
+        table_name = self.table_name.get()
+
+        if not file_name:
+            self._show_error("File selection error", "Please select a file")
+            return
+        if is_sqlite and not table_name:
+            self._show_error("Table selection error", "Please enter a table name")
+            return
+
+        try:
+            dataset_key = (os.path.abspath(file_name), is_sqlite, table_name, os.path.getmtime(file_name))
+            if dataset_key not in self._overviews:
+                self._overviews[dataset_key] = DensityOverview(self._chunk_source(file_name, is_sqlite, table_name))
+            if self._overview_window is not None and self._overview_window.top.winfo_exists():
+                self._overview_window.top.destroy()
+            self._overview_window = DensityOverviewWindow(self.root, self._overviews[dataset_key],
+                                                          on_bounds_picked=self._apply_picked_bounds)
+            # The data is read and binned by the overview window's worker thread
+            self._update_status("Overview opened; its window shows the binning progress.")
+        except FileNotFoundError:
+            self._show_error("File Not Found", f"Could not find {file_name}")
+        except Exception as e:
+            self._show_error("Overview Error", f"Error building the overview: {e}")
+            self._update_status("Overview failed.")
+
+    def _chunk_source(self, file_name, is_sqlite, table_name):
+        """Returns a callable that yields the dataset in chunks, reading only the binned columns and given ranges."""
+        columns = sorted({column for pair in OVERVIEW_PAIRS for column in pair})
+        if is_sqlite:
+            def chunks(ranges=None):
+                # Zoomed views only read the rows inside the zoomed region
+                conn = sqlite3.connect(file_name)
+                try:
+                    yield from sqlite_chunks(conn, table_name, columns=columns, ranges=ranges)
+                finally:
+                    conn.close()
+            return chunks
+        # Excel cannot be read in chunks, so keep one copy of the binned columns. The first
+        # binning job reads it on the overview's worker thread, never on the Tk thread.
+        loaded = {}
+        load_lock = threading.Lock()
+
+        def frame_region(ranges=None):
+            with load_lock:
+                if "df" not in loaded:
+                    loaded["df"] = pd.read_excel(file_name, usecols=columns)
+            df = loaded["df"]
+            mask = pd.Series(True, index=df.index)
+            for column, (low, high) in (ranges or {}).items():
+                mask &= df[column].abs().between(low, high)
+            return frame_chunks(df[mask])
+        return frame_region
+
+    def _apply_picked_bounds(self, bounds):
+        bound_vars = {
+            "M_total": (self.min_m_total, self.max_m_total),
+            "I2": (self.min_i2, self.max_i2),
+            "Resolution": (self.min_resolution, self.max_resolution),
+            "Linear_FOV": (self.min_linear_fov, self.max_linear_fov),
+        }
+        for column, (min_val, max_val) in bounds.items():
+            min_var, max_var = bound_vars[column]
+            min_var.set(f"{min_val:.6g}")
+            max_var.set(f"{max_val:.6g}")
 
     def _load_data(self, file_name, is_sqlite, table_name):
         try:
@@ -210,22 +322,42 @@ class DataRefinerGUI:
         output_db = f"refined_results_{timestamp}.db"
 
         try:
-            refined_df.to_excel(output_file, index=False)
-            self._update_status(f"Refined results saved to '{output_file}'.")
-        except Exception as e:
-            self._show_error("Excel Save Error", f"Error saving to Excel: {e}")
-            return
-
-        try:
-            conn = sqlite3.connect(output_db)
-            refined_df.to_sql('results', conn, if_exists='replace', index=False)
-            conn.commit()
-            conn.close()
+            with self.timer.stage("save_sqlite", rows=len(refined_df)):
+                conn = sqlite3.connect(output_db)
+                refined_df.to_sql('results', conn, if_exists='replace', index=False)
+                conn.commit()
+                conn.close()
             self._update_status(f"Refined results saved to '{output_db}'.")
         except Exception as e:
             self._show_error("SQLite Save Error", f"Error saving to SQLite: {e}")
+            self._end_run("SQLite save failed.")
+            return
+
+        # Excel is streamed on a worker thread so the window stays responsive. The worker
+        # only puts its outcome on this export's own queue, never touching Tk.
+        outcome = queue.Queue(maxsize=1)
+        thread = start_excel_export(frame_chunks(refined_df), output_file,
+                                    on_done=lambda result, error: outcome.put((result, error)), timer=self.timer)
+        self.process_button.config(state=tk.DISABLED)  # One export at a time
+        self._update_status(f"Refined results saved to '{output_db}'. Writing '{output_file}' in the background...")
+        self.root.after(EXPORT_POLL_MS, self._poll_export, thread, output_file, outcome, self.timer)
+
+    def _poll_export(self, thread, output_file, outcome, timer):
+        if thread.is_alive():
+            self.root.after(EXPORT_POLL_MS, self._poll_export, thread, output_file, outcome, timer)
+            return
+
+        self.process_button.config(state=tk.NORMAL)
+        result, error = outcome.get_nowait()
+        if error is not None:
+            self._show_error("Excel Save Error", f"Error saving to Excel: {error}")
+            self._update_status("Excel export failed.")
             return
 
+        rows, sheets = result
+        timer.write_log()
+        self._update_status(f"Data processing complete. {rows} rows saved to '{output_file}' ({sheets} sheet(s)).\n{timer.summary()}")
+
     def _get_numeric_input(self, var, name, allow_empty=False):
         try:
             value_str = var.get().strip()
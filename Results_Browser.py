@@ -0,0 +1,177 @@
+import tkinter as tk
+from tkinter import ttk
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+
+from Ray_Tracer import OBJECT_HEIGHT_DEFAULT, ray_trace_and_plot
+from Two_Lens_System import DESIGN_COLUMNS
+
+# --- Constants ---
+VISIBLE_ROWS = 30
+
+
+# --- Classes ---
+
+class ResultsBrowser:
+    """
+    Virtual-scrolling grid over a results table.
+
+    The table is kept as one NumPy array per column and the Treeview only
+    ever holds VISIBLE_ROWS items, whose values are rewritten as the view
+    scrolls, so millions of rows browse as fast as a hundred. Clicking a
+    heading sorts through an argsort index that is computed once per column
+    and cached. Selecting a row with f1, f2, d and S columns opens the design
+    in Ray_Tracer's ray_trace_and_plot view. That plot uses Ray_Tracer's own
+    thin-lens formula, so the image positions it draws can differ from the
+    row's I1/I2, which come from Two_Lens_System.
+    """
+
+    def __init__(self, master, df, title="Refined Results"):
+        self.columns = [str(column) for column in df.columns]
+        self.data = [df[column].to_numpy() for column in df.columns]
+        self.n_rows = len(df)
+        self.offset = 0
+        self.sort_column = None
+        self.descending = False
+        self._sort_cache = {}  # column index -> ascending argsort
+        self._visible_rows = []  # data row shown by each Treeview item
+        self._plot_window = None
+        self._figure = None
+
+        self.top = tk.Toplevel(master)
+        self.top.title(title)
+        self.top.grid_rowconfigure(0, weight=1)
+        self.top.grid_columnconfigure(0, weight=1)
+
+        self.tree = ttk.Treeview(self.top, columns=self.columns, show="headings", height=VISIBLE_ROWS,
+                                 selectmode="browse")
+        for index, column in enumerate(self.columns):
+            self.tree.heading(column, text=column, command=lambda index=index: self._sort_by(index))
+            self.tree.column(column, width=90, stretch=True, anchor=tk.E)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.items = [self.tree.insert("", tk.END, values=()) for _ in range(min(VISIBLE_ROWS, self.n_rows))]
+
+        self.scrollbar = ttk.Scrollbar(self.top, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        x_scrollbar = ttk.Scrollbar(self.top, orient=tk.HORIZONTAL, command=self.tree.xview)
+        x_scrollbar.grid(row=1, column=0, sticky="ew")
+        self.tree.configure(xscrollcommand=x_scrollbar.set)
+
+        self.status_label = ttk.Label(self.top, text="")
+        self.status_label.grid(row=2, column=0, columnspan=2, sticky="ew", padx=5, pady=5)
+
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", lambda event: self._scroll_to(self.offset - 3 * int(np.sign(event.delta))))
+        self.tree.bind("<Button-4>", lambda event: self._scroll_to(self.offset - 3))  # X11 wheel up
+        self.tree.bind("<Button-5>", lambda event: self._scroll_to(self.offset + 3))  # X11 wheel down
+        self.tree.bind("<Prior>", lambda event: self._scroll_to(self.offset - VISIBLE_ROWS))
+        self.tree.bind("<Next>", lambda event: self._scroll_to(self.offset + VISIBLE_ROWS))
+        self.top.protocol("WM_DELETE_WINDOW", self.close)
+        self._render()
+
+    # --- Virtual scrolling ---
+
+    def _row_indices(self, start, stop):
+        """Data rows at view positions start..stop, in the current sort order."""
+        if self.sort_column is None:
+            return np.arange(start, stop)
+        order = self._sort_cache[self.sort_column]
+        if self.descending:
+            return order[self.n_rows - 1 - np.arange(start, stop)]
+        return order[start:stop]
+
+    def _render(self):
+        stop = min(self.offset + len(self.items), self.n_rows)
+        self._visible_rows = self._row_indices(self.offset, stop)
+        for item, row in zip(self.items, self._visible_rows):
+            self.tree.item(item, values=[_format_value(column[row]) for column in self.data])
+        if self.n_rows:
+            self.scrollbar.set(self.offset / self.n_rows, stop / self.n_rows)
+        sort_text = ""
+        if self.sort_column is not None:
+            sort_text = f", sorted by {self.columns[self.sort_column]} {'descending' if self.descending else 'ascending'}"
+        self.status_label.config(text=f"Rows {self.offset + 1}-{stop} of {self.n_rows}{sort_text}. "
+                                      "Select a row to ray trace it.")
+
+    def _scroll_to(self, offset):
+        offset = int(max(0, min(offset, self.n_rows - len(self.items))))
+        if offset != self.offset:
+            self.offset = offset
+            self.tree.selection_remove(self.tree.selection())
+            self._render()
+        return "break"
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self._scroll_to(float(amount) * self.n_rows)
+        elif action == "scroll":
+            step = len(self.items) if unit == "pages" else 1
+            self._scroll_to(self.offset + int(amount) * step)
+
+    def _sort_by(self, column_index):
+        if self.sort_column == column_index:
+            self.descending = not self.descending
+        else:
+            if column_index not in self._sort_cache:
+                self.status_label.config(text=f"Indexing {self.columns[column_index]}...")
+                self.top.update_idletasks()
+                try:
+                    self._sort_cache[column_index] = np.argsort(self.data[column_index], kind="stable")
+                except TypeError:
+                    self.status_label.config(text=f"Cannot sort {self.columns[column_index]}: mixed value types.")
+                    return
+            self.sort_column = column_index
+            self.descending = False
+        self.offset = 0
+        self._render()
+
+    # --- Ray tracing ---
+
+    def _on_select(self, event):
+        selection = self.tree.selection()
+        if not selection:
+            return
+        row = self._visible_rows[self.items.index(selection[0])]
+        design = {column: self.data[self.columns.index(column)][row]
+                  for column in DESIGN_COLUMNS if column in self.columns}
+        if len(design) < len(DESIGN_COLUMNS):
+            self.status_label.config(text=f"Ray tracing needs the columns {', '.join(DESIGN_COLUMNS)}.")
+            return
+        self._show_ray_trace(*(float(design[column]) for column in DESIGN_COLUMNS))
+
+    def _show_ray_trace(self, f1, f2, d, S):
+        if self._plot_window is None or not self._plot_window.winfo_exists():
+            self._plot_window = tk.Toplevel(self.top)
+            self._plot_window.title("Ray Tracing: Two-Lens System")
+        for widget in self._plot_window.winfo_children():
+            widget.destroy()
+        if self._figure is not None:
+            plt.close(self._figure)
+
+        try:
+            self._figure, magnification = ray_trace_and_plot(f1, f2, d, S, OBJECT_HEIGHT_DEFAULT)
+        except (ZeroDivisionError, ValueError) as e:
+            self.status_label.config(text=f"Cannot ray trace this design: {e}")
+            return
+        canvas = FigureCanvasTkAgg(self._figure, master=self._plot_window)
+        canvas.draw()
+        toolbar = NavigationToolbar2Tk(canvas, self._plot_window)
+        toolbar.update()
+        canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        ttk.Label(self._plot_window, text=f"f1={f1:.6g}, f2={f2:.6g}, d={d:.6g}, S={S:.6g}  "
+                                          f"Total Magnification: {magnification:.2f}x").pack(side=tk.BOTTOM)
+
+    def close(self):
+        if self._figure is not None:
+            plt.close(self._figure)
+        self.top.destroy()
+
+
+# --- Functions ---
+
+def _format_value(value):
+    if isinstance(value, (float, np.floating)):
+        return f"{value:.6g}"
+    return str(value)
@@ -0,0 +1,99 @@
+import numpy as np
+
+# --- Constants ---
+REFERENCE_WAVELENGTH = 0.000055  # cm (550 nm), the wavelength the focal length is quoted at
+FRAUNHOFER_D = 0.00005876  # cm (587.6 nm)
+FRAUNHOFER_F = 0.00004861  # cm (486.1 nm)
+FRAUNHOFER_C = 0.00006563  # cm (656.3 nm)
+INDEX_DEFAULT = 1.5168  # n_d of N-BK7
+ABBE_DEFAULT = 64.17  # V_d of N-BK7
+NM_TO_CM = 1e-7
+
+
+# --- Functions ---
+
+def refractive_index(wavelength, n_d=INDEX_DEFAULT, abbe_number=ABBE_DEFAULT):
+    """
+    Refractive index from a two-term Cauchy fit, n = A + B / wavelength^2.
+
+    A and B are chosen so the glass has index n_d at the d line and
+    Abbe number V_d = (n_d - 1) / (n_F - n_C).
+
+    Args:
+        wavelength (float or ndarray): Wavelength (cm).
+        n_d (float): Refractive index at 587.6 nm.
+        abbe_number (float): Abbe number V_d.
+
+    Returns:
+        float or ndarray: Refractive index at each wavelength.
+    """
+    B = (n_d - 1) / (abbe_number * (1 / FRAUNHOFER_F**2 - 1 / FRAUNHOFER_C**2))
+    A = n_d - B / FRAUNHOFER_D**2
+    return A + B / np.asarray(wavelength) ** 2
+
+
+def chromatic_focal_length(focal_length, wavelength, n_d=INDEX_DEFAULT, abbe_number=ABBE_DEFAULT):
+    """Focal length of a thin lens at each wavelength; lens power scales with (n - 1)."""
+    n_ref = refractive_index(REFERENCE_WAVELENGTH, n_d, abbe_number)
+    return focal_length * (n_ref - 1) / (refractive_index(wavelength, n_d, abbe_number) - 1)
+
+
+def spectral_resolution(focal_length, object_distances, wavelengths, aperture_diameter,
+                        n_d=INDEX_DEFAULT, abbe_number=ABBE_DEFAULT, weights=None):
+    """
+    Resolution of a single thin lens over a wavelength band.
+
+    Evaluated as one (object distance x wavelength) broadcast. At each
+    wavelength the diffraction limit 1.22 * wavelength / D is combined in
+    quadrature with the geometric defocus blur caused by the chromatic focal
+    shift. Defocus is measured at the image plane of best focus for the
+    band, where the worst-case blur over the band is smallest, so bands
+    that exclude 550 nm (IR, UV) are not judged at a plane they never focus
+    on. The band is then reduced to worst-case and weighted values per
+    object distance, so the caller keeps one row per object distance.
+
+    Args:
+        focal_length (float): Focal length at REFERENCE_WAVELENGTH (cm).
+        object_distances (array-like): Object distances S (cm).
+        wavelengths (array-like): Wavelengths of the band (cm).
+        aperture_diameter (float): Aperture diameter (cm).
+        n_d (float): Refractive index of the lens glass at 587.6 nm.
+        abbe_number (float): Abbe number of the lens glass.
+        weights (array-like): Relative weight of each wavelength (for example
+            a source spectrum); uniform if None.
+
+    Returns:
+        dict: Arrays with one value per object distance, keyed by the column
+              names used in the exported tables.
+    """
+    S = np.asarray(object_distances, dtype=float)[:, None]
+    wavelengths = np.asarray(wavelengths, dtype=float)[None, :]
+    weights = np.ones(wavelengths.shape[1]) if weights is None else np.asarray(weights, dtype=float)
+    weights = weights / weights.sum()
+
+    f_band = chromatic_focal_length(focal_length, wavelengths, n_d, abbe_number)
+    # Image vergence 1/I = 1/f - 1/S stays finite where I itself diverges (S = f)
+    vergence = 1 / f_band - 1 / S
+    # Best focus for the band sits halfway between the extreme vergences
+    best_focus = (vergence.max(axis=1, keepdims=True) + vergence.min(axis=1, keepdims=True)) / 2
+    # Blur circle at that image plane, as an angle seen from the lens
+    defocus_rad = aperture_diameter * np.abs(vergence - best_focus)
+    with np.errstate(divide='ignore'):
+        I_band = 1 / vergence
+    diffraction_rad = 1.22 * (wavelengths / aperture_diameter)
+    angular_resolution_rad = np.hypot(diffraction_rad, defocus_rad)
+    linear_resolution = angular_resolution_rad * S  # In cm
+
+    return {
+        "Worst Angular Resolution (deg)": np.max(angular_resolution_rad, axis=1) * (180 / np.pi),
+        "Worst Linear Resolution (cm)": np.max(linear_resolution, axis=1),
+        "Weighted Linear Resolution (cm)": linear_resolution @ weights,
+        "Chromatic Image Spread (cm)": np.ptp(I_band, axis=1),
+    }
+
+
+def wavelength_band(start_nm, end_nm, steps):
+    """Returns `steps` evenly spaced wavelengths from start_nm to end_nm, in cm; raises ValueError for an invalid band."""
+    if start_nm <= 0 or end_nm < start_nm or steps < 1:
+        raise ValueError("the band needs a positive start <= end (nm) and at least one wavelength")
+    return np.linspace(start_nm, end_nm, steps) * NM_TO_CM
@@ -0,0 +1,156 @@
+import sqlite3
+import warnings
+from datetime import datetime
+
+import numpy as np
+
+from Excel_Export import sqlite_chunks
+from Instrumentation import PipelineTimer
+from Two_Lens_System import (BOUND_COLUMNS, DESIGN_COLUMNS, WAVELENGTH_DEFAULT, bounds_mask, input_range,
+                             two_lens_properties)
+
+# --- Constants ---
+FOCAL_TOLERANCE_DEFAULT = 0.01  # Relative, +/- 1 % on f1 and f2
+SPACING_TOLERANCE_DEFAULT = 0.01  # cm, +/- on the lens separation
+DISTANCE_TOLERANCE_DEFAULT = 0.05  # cm, +/- on the object distance
+SAMPLES_DEFAULT = 1000
+MC_CHUNK_ELEMENTS = 2_000_000  # designs x samples evaluated per step
+
+
+# --- Functions ---
+
+def _perturb(rng, nominal, tolerance, n_samples, distribution, relative=False):
+    """Draws (designs x samples) perturbed copies of a nominal column."""
+    shape = (len(nominal), n_samples)
+    if distribution == "normal":
+        # Tolerance taken as 3 sigma
+        noise = rng.standard_normal(shape) * (tolerance / 3)
+    elif distribution == "uniform":
+        noise = rng.uniform(-tolerance, tolerance, shape)
+    else:
+        raise ValueError(f"Unknown distribution '{distribution}'; use 'uniform' or 'normal'.")
+    nominal = nominal[:, None]
+    return nominal * (1 + noise) if relative else nominal + noise
+
+
+def tolerance_yield(designs_df, bounds, n_samples=SAMPLES_DEFAULT,
+                    focal_tolerance=FOCAL_TOLERANCE_DEFAULT,
+                    spacing_tolerance=SPACING_TOLERANCE_DEFAULT,
+                    distance_tolerance=DISTANCE_TOLERANCE_DEFAULT,
+                    aperture_diameter=None, distribution="uniform",
+                    wavelength=WAVELENGTH_DEFAULT, seed=None):
+    """
+    Monte Carlo tolerance analysis of two-lens designs against Refiner bounds.
+
+    Every design is perturbed n_samples times (f1 and f2 by a relative
+    tolerance, d and S by absolute ones) and the perturbed systems are
+    evaluated as one broadcast (designs x samples) array per chunk.
+
+    Args:
+        designs_df (DataFrame): Designs with f1, f2, d and S columns, and
+            optionally D1/D2 lens diameters.
+        bounds (dict): Maps a column in BOUND_COLUMNS to a (min, max) tuple.
+        n_samples (int): Perturbed samples per design.
+        focal_tolerance (float): Relative focal length tolerance (0.01 = 1 %).
+        spacing_tolerance (float): Lens separation tolerance (cm).
+        distance_tolerance (float): Object distance tolerance (cm).
+        aperture_diameter (float): Lens diameter used when the table has no
+            D1/D2 columns (cm).
+        distribution (str): "uniform" within +/- tolerance, or "normal" with
+            the tolerance as 3 sigma.
+        wavelength (float): Wavelength of light (cm).
+        seed (int): Seed for reproducible samples.
+
+    Returns:
+        DataFrame: designs_df with Yield_pct (percentage of samples inside
+                   every bound) and <column>_std (spread of each bound column
+                   over the samples) appended.
+    """
+    missing = [column for column in DESIGN_COLUMNS if column not in designs_df.columns]
+    if missing:
+        raise ValueError(f"Designs table is missing column(s): {', '.join(missing)}")
+    if aperture_diameter is None and not {"D1", "D2"} <= set(designs_df.columns):
+        raise ValueError("Designs table has no D1/D2 columns; please give an aperture diameter.")
+
+    rng = np.random.default_rng(seed)
+    f1_all, f2_all, d_all, S_all = (designs_df[column].to_numpy(dtype=float) for column in DESIGN_COLUMNS)
+    if {"D1", "D2"} <= set(designs_df.columns):
+        D1_all = designs_df["D1"].to_numpy(dtype=float)
+        D2_all = designs_df["D2"].to_numpy(dtype=float)
+    else:
+        D1_all = D2_all = np.full(len(designs_df), float(aperture_diameter))
+
+    yield_pct = np.empty(len(designs_df))
+    spreads = {column: np.empty(len(designs_df)) for column in BOUND_COLUMNS}
+    chunk = max(1, MC_CHUNK_ELEMENTS // n_samples)
+    for start in range(0, len(designs_df), chunk):
+        rows = slice(start, start + chunk)
+        f1 = _perturb(rng, f1_all[rows], focal_tolerance, n_samples, distribution, relative=True)
+        f2 = _perturb(rng, f2_all[rows], focal_tolerance, n_samples, distribution, relative=True)
+        d = _perturb(rng, d_all[rows], spacing_tolerance, n_samples, distribution)
+        S = _perturb(rng, S_all[rows], distance_tolerance, n_samples, distribution)
+        values = two_lens_properties(f1, f2, d, S, D1_all[rows, None], D2_all[rows, None], wavelength)
+
+        inside = np.broadcast_to(bounds_mask(values, bounds), f1.shape)
+        yield_pct[rows] = inside.mean(axis=1) * 100
+        for column in BOUND_COLUMNS:
+            column_values = np.broadcast_to(values[column], f1.shape)
+            # Samples that land on a singularity do not count towards the spread
+            finite = np.where(np.isfinite(column_values), column_values, np.nan)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)  # All-singular rows give NaN
+                spreads[column][rows] = np.nanstd(finite, axis=1)
+
+    result = designs_df.copy()
+    result["Yield_pct"] = yield_pct
+    for column in BOUND_COLUMNS:
+        result[f"{column}_std"] = spreads[column]
+    return result
+
+
+def main():
+    file_name = input("Refined results database: ").strip()
+    table_name = input("Table name (blank for 'results'): ").strip() or "results"
+    try:
+        bounds = {column: input_range(column) for column in BOUND_COLUMNS}
+        n_samples = int(input(f"Samples per design (blank for {SAMPLES_DEFAULT}): ").strip() or SAMPLES_DEFAULT)
+        focal_tolerance = float(input(f"Focal length tolerance, fraction (blank for {FOCAL_TOLERANCE_DEFAULT}): ").strip()
+                                or FOCAL_TOLERANCE_DEFAULT)
+        spacing_tolerance = float(input(f"Lens separation tolerance, cm (blank for {SPACING_TOLERANCE_DEFAULT}): ").strip()
+                                  or SPACING_TOLERANCE_DEFAULT)
+        distance_tolerance = float(input(f"Object distance tolerance, cm (blank for {DISTANCE_TOLERANCE_DEFAULT}): ").strip()
+                                   or DISTANCE_TOLERANCE_DEFAULT)
+        aperture_str = input("Aperture diameter, cm (blank if the table has D1/D2): ").strip()
+        aperture_diameter = float(aperture_str) if aperture_str else None
+    except ValueError:
+        print("Invalid input. Please enter numeric values only.")
+        return
+
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    output_db = f"tolerance_results_{timestamp}.db"
+    timer = PipelineTimer("tolerance")
+    try:
+        conn = sqlite3.connect(file_name)
+        out_conn = sqlite3.connect(output_db)
+        with timer.stage("analyse") as record:
+            record["rows"] = 0
+            # Designs are streamed so the input table never has to fit in memory
+            for designs_df in sqlite_chunks(conn, table_name):
+                result = tolerance_yield(designs_df, bounds, n_samples, focal_tolerance, spacing_tolerance,
+                                         distance_tolerance, aperture_diameter)
+                result.to_sql('results', out_conn, if_exists='replace' if record["rows"] == 0 else 'append',
+                              index=False)
+                record["rows"] += len(result)
+        out_conn.commit()
+        out_conn.close()
+        conn.close()
+    except Exception as e:
+        print(f"An error occurred during the tolerance analysis: {e}")
+        return
+
+    print(f"Tolerance yields for {record['rows']} designs saved to '{output_db}'.")
+    print(timer.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import numpy as np
+
+# --- Constants ---
+WAVELENGTH_DEFAULT = 0.000055  # cm (550 nm), same constant as One_Lens.py
+BOUND_COLUMNS = ("M_total", "I2", "Resolution", "Linear_FOV")
+DESIGN_COLUMNS = ("f1", "f2", "d", "S")  # Parameters that define a two-lens design
+
+
+# --- Functions ---
+
+def two_lens_properties(f1, f2, d, S, aperture_diameter, field_diameter, wavelength=WAVELENGTH_DEFAULT):
+    """
+    Calculates the properties of a thin two-lens system.
+
+    All arguments may be scalars or NumPy arrays; they are broadcast against
+    each other so a whole grid of designs is evaluated in one call.
+
+    Args:
+        f1 (float or ndarray): Focal length of the first lens (cm).
+        f2 (float or ndarray): Focal length of the second lens (cm).
+        d (float or ndarray): Separation between the two lenses (cm).
+        S (float or ndarray): Object distance from the first lens (positive value, cm).
+        aperture_diameter (float or ndarray): Diameter of the first lens (aperture stop, cm).
+        field_diameter (float or ndarray): Diameter of the second lens (field stop, cm).
+        wavelength (float or ndarray): Wavelength of light (cm).
+
+    Returns:
+        dict: Arrays keyed by column name: I1, S2, I2, M_total, Resolution and
+              Linear_FOV. Singular designs (object at a focal point) give inf/nan.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # First lens, same convention as One_Lens.py: I = F*S / (S - F), M = -I / S
+        I1 = f1 * S / (S - f1)
+        # The first image is the object of the second lens
+        S2 = d - I1
+        I2 = f2 * S2 / (S2 - f2)
+        M_total = (I1 / S) * (I2 / S2)
+        # Diffraction limit of the aperture stop, projected to the object plane
+        Resolution = 1.22 * (wavelength / aperture_diameter) * S
+        # The chief ray crosses lens 1 undeviated, so lens 2 clips the field
+        # at an object-side half angle of (field_diameter / 2) / d
+        Linear_FOV = S * field_diameter / d
+
+    return {
+        "I1": I1,
+        "S2": S2,
+        "I2": I2,
+        "M_total": M_total,
+        "Resolution": Resolution,
+        "Linear_FOV": Linear_FOV,
+    }
+
+
+def bounds_mask(values, bounds):
+    """
+    Applies Refiner bounds to evaluated designs.
+
+    Matches DataRefinerGUI._filter_data: a column is checked only when both
+    its minimum and maximum are given, and the check is on the absolute value.
+
+    Args:
+        values (dict or DataFrame): Arrays keyed by column name.
+        bounds (dict): Maps a column in BOUND_COLUMNS to a (min, max) tuple;
+                       either end may be None.
+
+    Returns:
+        ndarray: Boolean mask of the designs inside every bound.
+    """
+    mask = True
+    for column, (min_val, max_val) in bounds.items():
+        if min_val is None or max_val is None:
+            continue
+        magnitude = np.abs(np.asarray(values[column]))
+        with np.errstate(invalid='ignore'):
+            mask = mask & (magnitude >= min_val) & (magnitude <= max_val)
+    return np.asarray(mask)
+
+
+def input_range(name, optional=True):
+    """
+    Reads a min/max pair at the console, for the command-line programs.
+
+    Args:
+        name (str): What the pair bounds, shown in the prompts.
+        optional (bool): If True an empty answer leaves that end open (None).
+
+    Returns:
+        tuple: (min, max). Raises ValueError on non-numeric input.
+    """
+    suffix = " (blank to skip)" if optional else ""
+    min_str = input(f"Input minimum {name}{suffix}: ").strip()
+    max_str = input(f"Input maximum {name}{suffix}: ").strip()
+    if optional:
+        return (float(min_str) if min_str else None, float(max_str) if max_str else None)
+    return float(min_str), float(max_str)